@@ -152,6 +152,19 @@ app.include_router(projects.router, prefix="/api/projects", tags=["projects"])
 app.include_router(llm_config.router, prefix="/api/llm", tags=["llm"])
 app.include_router(extension.router, prefix="/api/extension", tags=["extension"])
 
+
+@app.on_event("startup")
+def _warm_optimizer_workers():
+    """启动时预热优化器子进程的 fork server（后台导入 dspy），首个优化请求不再承担冷启动。"""
+    optimizer.warm_optimizer_workers()
+
+
+@app.on_event("shutdown")
+def _close_shared_http_session():
+    """服务关闭时释放模拟器共享的 HTTP 连接池。"""
+    from simulator.llm_client import close_http_session
+    close_http_session()
+
 web_dir = os.path.join(_ROOT, "web", "static")
 legacy_index_path = os.path.join(web_dir, "index.html")
 
@@ -41,7 +41,7 @@ def _run_closed_loop(req: ClosedLoopRequest, workspace_id: str, progress_callbac
     base_url = (llm.get("base_url") or "").rstrip("/")
     model_name = llm.get("model") or ""
     # 闭环仿真默认与全局配置一致，未设置时使用豆包
-    model_type = (llm.get("model_type") or "doubao").lower()
+    model_type = llm.get("model_type") or "doubao"
     api_url = build_chat_completions_url(base_url)
     _, output_dir, _ = get_project_dirs(workspace_id)
     sim_output = os.path.join(output_dir, "simulator_output", "closed_loop")
@@ -22,7 +22,7 @@ from api.exceptions import BadRequestError, LLMError
 from parsers import get_parser_for_extension
 
 # 允许的剧本扩展名
-ALLOWED_EXT = {".md", ".docx", ".doc", ".pdf"}
+ALLOWED_EXT = frozenset({".md", ".docx", ".doc", ".pdf"})
 
 # 放宽 multipart 单 part 大小，避免大文件触发 413/400
 MAX_UPLOAD_PART_SIZE = 50 * 1024 * 1024  # 50MB
@@ -5,14 +5,16 @@
 """
 import os
 import json
+import threading
+from functools import lru_cache
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 router = APIRouter()
 
 from api.routes.auth import require_workspace_owned
-from api.workspace import get_workspace_file_path
+from api.workspace import get_workspace_file_path, stat_or_none
 
 LLM_CONFIG_FILE = "llm_config.json"
 
@@ -24,6 +26,7 @@ PRESETS = {
 }
 
 
+@lru_cache(maxsize=64)
 def build_chat_completions_url(base_url: str) -> str:
     """
     根据基础 base_url 构建 OpenAI Chat Completions 端点。
@@ -44,23 +47,48 @@ def _config_path(workspace_id: str) -> str:
     return get_workspace_file_path(workspace_id, LLM_CONFIG_FILE)
 
 
+_dotenv_loaded = False
+
+# 已解析的 LLM 配置缓存：workspace_id -> (缓存键, 配置)。
+# 缓存键含 llm_config.json 的 (mtime_ns, size) 与相关环境变量，文件被保存或手工修改后自动失效。
+_llm_config_cache: Dict[str, Tuple[tuple, dict]] = {}
+_llm_config_cache_lock = threading.Lock()
+
+
+def _ensure_dotenv() -> None:
+    """进程内只加载一次 .env（load_dotenv 不覆盖已有环境变量，重复调用只是重复读文件）。"""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+
 def get_llm_config(workspace_id: Optional[str] = None) -> dict:
     """
     获取当前生效的 LLM 配置（API Key + base_url + model）。
     若提供 workspace_id 且该工作区有 llm_config.json，则使用；否则从 .env 读取。
     返回: {"api_key": str, "model_type": str, "base_url": str, "model": str}
     """
-    from dotenv import load_dotenv
-    load_dotenv()
+    _ensure_dotenv()
     env_key_ds = os.getenv("DEEPSEEK_API_KEY")
     env_key_db = os.getenv("LLM_API_KEY")
     # 默认优先使用豆包（公司内网 LLM），除非显式指定 MODEL_TYPE=deepseek
     env_model_type = (os.getenv("MODEL_TYPE") or "doubao").lower()
 
+    cache_key = None
     cfg = {}
     if workspace_id:
         path = _config_path(workspace_id)
-        if os.path.isfile(path):
+        st = stat_or_none(path)
+        cache_key = (
+            (st.st_mtime_ns, st.st_size) if st is not None else None,
+            env_key_ds, env_key_db, env_model_type,
+        )
+        cached = _llm_config_cache.get(workspace_id)
+        if cached is not None and cached[0] == cache_key:
+            return dict(cached[1])
+        if st is not None:
             try:
                 with open(path, "r", encoding="utf-8") as f:
                     cfg = json.load(f)
@@ -89,12 +117,17 @@ def get_llm_config(workspace_id: Optional[str] = None) -> dict:
             base_url = PRESETS["deepseek"][0]
             model_name = PRESETS["deepseek"][1]
 
-    return {
+    result = {
         "api_key": api_key,
         "model_type": model_type,
         "base_url": base_url.rstrip("/"),
         "model": model_name,
     }
+    if cache_key is not None:
+        with _llm_config_cache_lock:
+            _llm_config_cache[workspace_id] = (cache_key, result)
+        return dict(result)
+    return result
 
 
 def require_llm_config(workspace_id: Optional[str] = None) -> dict:
@@ -118,15 +151,14 @@ def get_config(workspace_id: str = Depends(require_workspace_owned)):
     """返回当前工作区 LLM 配置（用于设置页展示）。api_key 脱敏返回，默认免费 Key 不暴露。"""
     path = _config_path(workspace_id)
     raw = {}
-    if os.path.isfile(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                raw = json.load(f)
-        except Exception:
-            pass
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except Exception:
+        pass
     raw_key = (raw.get("api_key") or "").strip()
     llm = get_llm_config(workspace_id)
-    model_type = (llm.get("model_type") or "doubao").strip().lower()
+    model_type = llm.get("model_type") or "doubao"
     base_url = (llm.get("base_url") or "").rstrip("/") or PRESETS.get(model_type, PRESETS["doubao"])[0]
     model = (llm.get("model") or "").strip() or PRESETS.get(model_type, PRESETS["doubao"])[1]
     api_key = (llm.get("api_key") or "").strip()
@@ -159,12 +191,11 @@ def save_config(body: LLMConfigUpdate, workspace_id: str = Depends(require_works
     """保存当前工作区 LLM 配置（API Key + 模型）。全系统解析、生成卡片、优化器、模拟器均使用此配置。"""
     path = _config_path(workspace_id)
     current = {}
-    if os.path.isfile(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                current = json.load(f)
-        except Exception:
-            pass
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            current = json.load(f)
+    except Exception:
+        pass
     if body.api_key is not None:
         current["api_key"] = (body.api_key or "").strip()
     if body.model_type is not None:
@@ -177,6 +208,8 @@ def save_config(body: LLMConfigUpdate, workspace_id: str = Depends(require_works
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(current, f, ensure_ascii=False, indent=2)
+    with _llm_config_cache_lock:
+        _llm_config_cache.pop(workspace_id, None)
     return {"message": "已保存，本工作区将使用该 API Key 与模型"}
 
 
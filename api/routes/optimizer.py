@@ -5,7 +5,8 @@ DSPy 优化 API。
 说明：
 - 路由层仅负责参数校验与协议（SSE 事件）；
 - 具体业务逻辑委托给 `api.services.optimizer_service`。
-- 使用子进程而非线程运行优化器，避免 dspy.settings 的线程局部性冲突（dspy 只能在首次配置的线程中修改）。
+- 使用子进程而非线程运行优化器，避免 dspy.settings 的线程局部性冲突（dspy 只能在首次配置的线程中修改）；
+  子进程由预加载 dspy 的 fork server 派生（见 warm_optimizer_workers）。
 """
 import json
 import os
@@ -30,10 +31,28 @@ try:
 except Exception:
     DSPY_AVAILABLE = False
 
+# 优化子进程的启动方式：支持 forkserver 的平台上由预加载了 dspy 与优化器模块的 fork server 派生子进程，
+# 每次运行仍是独立进程（dspy.settings 互不干扰），但免去 spawn 的冷导入，也避免直接 fork 多线程的服务进程。
+_OPTIMIZER_PRELOAD = ["generators.dspy_optimizer", "api.routes.optimizer"]
+if "forkserver" in mp.get_all_start_methods():
+    _MP_CTX = mp.get_context("forkserver")
+    _MP_CTX.set_forkserver_preload(_OPTIMIZER_PRELOAD)
+else:
+    _MP_CTX = mp.get_context()
+
+
+def warm_optimizer_workers() -> None:
+    """提前启动 fork server 并完成预加载，首次优化请求无需等待导入。非 forkserver 平台为空操作。"""
+    if not DSPY_AVAILABLE or _MP_CTX.get_start_method() != "forkserver":
+        return
+    from multiprocessing import forkserver
+    forkserver.ensure_running()
+
 
 def _optimizer_worker(req_dict: dict, workspace_id: str, result_queue: mp.Queue) -> None:
     """在子进程中运行优化器，确保 dspy 在进程主线程中配置，避免线程冲突。"""
-    req = OptimizeRequest(**req_dict)
+    # req_dict 来自路由层已校验的 model_dump()，此处直接构造，免去二次校验
+    req = OptimizeRequest.model_construct(**req_dict)
 
     def progress_cb(current: int, total: int, message: str):
         result_queue.put(("progress", {"current": current, "total": total, "message": message}))
@@ -65,8 +84,8 @@ def run_optimizer(req: OptimizeRequest, workspace_id: str = Depends(require_work
     require_llm_config(workspace_id)
     _precheck_trainset_path(workspace_id, req.trainset_path)
 
-    result_queue = mp.Queue()
-    proc = mp.Process(
+    result_queue = _MP_CTX.Queue()
+    proc = _MP_CTX.Process(
         target=_optimizer_worker,
         args=(req.model_dump(), workspace_id, result_queue),
     )
@@ -92,8 +111,8 @@ async def run_optimizer_stream(req: OptimizeRequest, workspace_id: str = Depends
     require_llm_config(workspace_id)
     _precheck_trainset_path(workspace_id, req.trainset_path)
 
-    result_queue = mp.Queue()
-    proc = mp.Process(
+    result_queue = _MP_CTX.Queue()
+    proc = _MP_CTX.Process(
         target=_optimizer_worker,
         args=(req.model_dump(), workspace_id, result_queue),
     )
@@ -4,6 +4,7 @@ output 目录：列出当前工作区 output 下的文件、上传评估报告
 支持读取/写入文件内容，供卡片与评估结果的可视化编辑使用。
 """
 import os
+import stat
 from urllib.parse import quote
 from fastapi import APIRouter, Request, UploadFile, Depends
 from fastapi.responses import FileResponse
@@ -14,11 +15,11 @@ from starlette.datastructures import UploadFile as StarletteUploadFile
 router = APIRouter()
 
 from api.routes.auth import require_workspace_owned
-from api.workspace import get_project_dirs, resolve_workspace_path, normalize_output_rel, list_dir_files, list_dir_files_with_mtime, save_upload_to_dir
+from api.workspace import get_project_dirs, resolve_workspace_path, normalize_output_rel, list_dir_files, list_dir_files_with_mtime, save_upload_to_dir, stat_or_none
 from api.exceptions import NotFoundError, LLMError, BadRequestError
 
 # 评估报告允许的扩展名
-EXPORT_ALLOWED_EXT = {".md", ".json", ".txt"}
+EXPORT_ALLOWED_EXT = frozenset({".md", ".json", ".txt"})
 
 # 放宽 multipart 单 part 大小，避免大文件触发 413/400
 MAX_UPLOAD_PART_SIZE = 50 * 1024 * 1024  # 50MB
@@ -150,8 +151,9 @@ def delete_output_file(
         raise BadRequestError("path 非法", details={"path": path})
     if not path.startswith("output/"):
         path = "output/" + path.lstrip("/")
-    full_path = resolve_workspace_path(workspace_id, path, kind="output", must_exist=True)
-    if not os.path.isfile(full_path):
+    full_path = resolve_workspace_path(workspace_id, path, kind="output")
+    st = stat_or_none(full_path)
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise NotFoundError("文件不存在或非文件", details={"path": path})
     try:
         os.remove(full_path)
@@ -2,7 +2,6 @@
 """
 智慧树平台配置：按工作区读写（workspaces/<id>/platform_config.json），注入时使用该配置。
 """
-import os
 import re
 import json
 from fastapi import APIRouter, Depends
@@ -29,21 +28,24 @@ PLATFORM_REQUIRED_DISPLAY = {
     "start_node_id": "PLATFORM_START_NODE_ID",
     "end_node_id": "PLATFORM_END_NODE_ID",
 }
+# (键, 显示名) 预先配对，检查时一次遍历即可
+_REQUIRED_KEY_LABELS = tuple((k, PLATFORM_REQUIRED_DISPLAY.get(k, k)) for k in PLATFORM_REQUIRED_KEYS)
+
+# 智慧树页面 URL 中课程 ID 与训练任务 ID 的位置
+_COURSE_ID_RE = re.compile(r"agent-course-full/([^/]+)")
+_TRAIN_TASK_ID_RE = re.compile(r"trainTaskId=([^&]+)")
 
 
 def check_platform_config_keys(cfg: dict) -> tuple[bool, list[str]]:
     """检查配置是否包含注入所需的全部项。返回 (是否完整, 缺失项的显示名列表)。"""
-    missing = []
-    for k in PLATFORM_REQUIRED_KEYS:
-        if not (cfg.get(k) and str(cfg.get(k)).strip()):
-            missing.append(PLATFORM_REQUIRED_DISPLAY.get(k, k))
-    return (len(missing) == 0, missing)
+    missing = [label for k, label in _REQUIRED_KEY_LABELS if not str(cfg.get(k) or "").strip()]
+    return (not missing, missing)
 
 
 def extract_course_and_task_from_url(url: str) -> tuple[Optional[str], Optional[str]]:
     """从智慧树页面 URL 提取 course_id 和 train_task_id。返回 (course_id, train_task_id)。"""
-    course_match = re.search(r"agent-course-full/([^/]+)", url)
-    task_match = re.search(r"trainTaskId=([^&]+)", url)
+    course_match = _COURSE_ID_RE.search(url)
+    task_match = _TRAIN_TASK_ID_RE.search(url)
     cid = course_match.group(1) if course_match else None
     tid = task_match.group(1) if task_match else None
     return (cid, tid)
@@ -55,8 +57,6 @@ def _workspace_config_path(workspace_id: str) -> str:
 
 def _read_workspace_config(path: str) -> dict:
     """读取工作区 platform_config.json，不存在或读失败返回空 dict。"""
-    if not os.path.isfile(path):
-        return {}
     try:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -1,21 +1,31 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import logging
 import os
+import queue
+import threading
 import time
-from fastapi import APIRouter, Depends
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Literal, Optional
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 from simulator import SessionRunner, SessionConfig
 from simulator.card_loader import LocalCardLoader
 from api.routes.auth import require_workspace_owned
-from api.workspace import get_project_dirs, get_workspace_dirs, resolve_workspace_path
+from api.workspace import get_project_dirs, get_workspace_dirs, resolve_workspace_path, stat_or_none
 from api.routes.llm_config import build_chat_completions_url
 from simulator.session_runner import SessionMode
 from simulator.evaluator import EvaluatorFactory
 from api.routes.llm_config import require_llm_config
-from api.exceptions import BadRequestError, NotFoundError, LLMError
+from api.exceptions import BadRequestError, EduFlowError, NotFoundError, LLMError
+from api.utils import json_codec
+from api.utils.json_codec import FastJSONResponse
 
 
 def _card_to_parsed_item(card):
@@ -41,11 +51,26 @@ def _card_to_parsed_item(card):
 # 基于内容试玩时写入的临时文件子目录
 EDIT_PREVIEW_DIR = "_edit_preview"
 
+# 评估报告落盘放到后台线程，不占用响应时间；线程数即并发写盘上限
+_report_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sim-report-writer")
+
+
+def _write_report(evaluator, report, reports_dir: str) -> None:
+    try:
+        evaluator.save_report(report, reports_dir)
+    except Exception:
+        logger.exception("保存评估报告失败: %s", reports_dir)
+
+
+def _save_report_async(evaluator, report, reports_dir: str) -> None:
+    """提交评估报告保存任务（含建目录），立即返回。"""
+    _report_writer.submit(_write_report, evaluator, report, reports_dir)
+
 
 class SimulateRequest(BaseModel):
     cards_path: str
     persona_id: str = "excellent"
-    mode: str = "auto"
+    mode: Literal["auto", "manual", "hybrid"] = "auto"
     output_dir: str = "simulator_output"
     run_evaluation: bool = True
 
@@ -59,30 +84,42 @@ class SimulateFromContentRequest(BaseModel):
 @router.get("/cards-parsed")
 def get_cards_parsed(
     path: str,
+    request: Request,
     workspace_id: str = Depends(require_workspace_owned),
 ):
-    """解析卡片文件，返回按执行顺序排列的卡片列表，供前端平台式分块展示。path 相对 output，如 output/cards_xxx.md。"""
+    """解析卡片文件，返回按执行顺序排列的卡片列表，供前端平台式分块展示。path 相对 output，如 output/cards_xxx.md。
+
+    支持条件请求：文件未变化（大小与 mtime 相同）时，If-None-Match 命中返回 304，不再读取与解析。
+    """
     md_path = resolve_workspace_path(workspace_id, path, kind="output", must_exist=True)
+    st = stat_or_none(md_path)
+    cache_headers = {}
+    if st is not None:
+        etag = f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+        cache_headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+            "Cache-Control": "private, max-age=0, must-revalidate",
+        }
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
     try:
         loader = LocalCardLoader()
         with open(md_path, "r", encoding="utf-8", errors="replace") as f:
             content = f.read()
         cards = loader.parse_markdown_content(content)
         sequence = loader.get_card_sequence(cards)
-        return {"cards": [_card_to_parsed_item(c) for c in sequence]}
+        return FastJSONResponse(
+            {"cards": [_card_to_parsed_item(c) for c in sequence]},
+            headers=cache_headers,
+        )
     except Exception as e:
         raise LLMError("解析卡片失败", details={"reason": str(e)})
 
 
-@router.post("/run")
-def run_simulation(req: SimulateRequest, workspace_id: str = Depends(require_workspace_owned)):
-    """运行学生模拟测试（仅支持 auto 模式），卡片与输出均在当前工作区。
-
-    使用当前工作区 LLM 配置（设置中的 API Key + 模型）作为 NPC 与学生 LLM 的统一配置。
-    """
+def _run_simulation(req: SimulateRequest, workspace_id: str, turn_callback=None) -> dict:
+    """核心逻辑：解析卡片路径、运行 auto 模式仿真，可选评估。返回 result 字典。"""
     md_path = resolve_workspace_path(workspace_id, req.cards_path, kind="output", must_exist=True)
-    if req.mode not in ("auto", "manual", "hybrid"):
-        req = req.model_copy(update={"mode": "auto"})
     if req.mode != "auto":
         raise BadRequestError(
             "Web API 暂仅支持 auto 模式；manual/hybrid 请使用命令行 python main.py --simulate ..."
@@ -112,37 +149,95 @@ def run_simulation(req: SimulateRequest, workspace_id: str = Depends(require_wor
         custom_persona_dir=persona_lib if os.path.isdir(persona_lib) else None,
         npc_config=npc_student_config,
         student_config=npc_student_config,
+        turn_callback=turn_callback,
     )
     runner = SessionRunner(config)
     runner.load_cards(md_path)
     runner.setup()
     log = runner.run()
+    # 对话列表只构建一次，同时用于响应与评估
+    dialogue = runner.get_dialogue_for_evaluation()
     result = {
         "session_id": log.session_id,
         "start_time": log.start_time,
         "end_time": log.end_time,
         "config": log.config,
         "cards_used": log.cards_used,
-        "dialogue": [
-            {"turn": d.turn_number, "card_id": d.card_id, "speaker": d.speaker, "content": d.content}
-            for d in log.dialogue
-        ],
         "summary": log.summary,
     }
+    # 流式模式下对话已逐轮推送，终态结果不再重复携带整段 dialogue
+    if turn_callback is None:
+        result["dialogue"] = dialogue
     if req.run_evaluation and log.summary.get("status") == "completed":
         try:
-            evaluator = EvaluatorFactory.create_from_env()
-            dialogue = runner.get_dialogue_for_evaluation()
+            evaluator = EvaluatorFactory.get_shared_from_env()
             report = evaluator.evaluate(dialogue, session_id=log.session_id)
-            reports_dir = os.path.join(run_output, "reports")
-            os.makedirs(reports_dir, exist_ok=True)
-            evaluator.save_report(report, reports_dir)
+            _save_report_async(evaluator, report, os.path.join(run_output, "reports"))
             result["evaluation"] = report.to_dict()
         except Exception as e:
             result["evaluation_error"] = str(e)
     return result
 
 
+@router.post("/run")
+def run_simulation(req: SimulateRequest, workspace_id: str = Depends(require_workspace_owned)):
+    """运行学生模拟测试（仅支持 auto 模式），卡片与输出均在当前工作区。
+
+    使用当前工作区 LLM 配置（设置中的 API Key + 模型）作为 NPC 与学生 LLM 的统一配置。
+    """
+    return FastJSONResponse(_run_simulation(req, workspace_id))
+
+
+@router.post("/run-stream")
+async def run_simulation_stream(req: SimulateRequest, workspace_id: str = Depends(require_workspace_owned)):
+    """流式运行学生模拟：每产生一轮对话即通过 SSE 推送 turn 事件，结束时推送 summary/evaluation。"""
+    q = queue.Queue()
+
+    def run():
+        try:
+            def turn_cb(turn):
+                q.put(("turn", {
+                    "turn": turn.turn_number,
+                    "card_id": turn.card_id,
+                    "speaker": turn.speaker,
+                    "content": turn.content,
+                }))
+
+            result = _run_simulation(req, workspace_id, turn_callback=turn_cb)
+            q.put(("done", result))
+        except EduFlowError as e:
+            q.put(("error", e.message))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            q.put(("error", str(e)))
+
+    th = threading.Thread(target=run, daemon=True)
+    th.start()
+
+    async def event_stream():
+        while True:
+            try:
+                typ, payload = q.get(timeout=0.2)
+            except queue.Empty:
+                await asyncio.sleep(0.1)
+                continue
+            if typ == "turn":
+                yield b"event: turn\ndata: " + json_codec.dumps(payload) + b"\n\n"
+            elif typ == "done":
+                yield b"event: done\ndata: " + json_codec.dumps(payload) + b"\n\n"
+                break
+            elif typ == "error":
+                yield b"event: error\ndata: " + json_codec.dumps({"detail": payload}) + b"\n\n"
+                break
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/run-from-content")
 def run_simulation_from_content(
     req: SimulateFromContentRequest,
@@ -156,8 +251,9 @@ def run_simulation_from_content(
     os.makedirs(preview_dir, exist_ok=True)
     ts = time.strftime("%Y%m%d_%H%M%S")
     preview_path = os.path.join(preview_dir, f"cards_preview_{ts}.md")
+    cards_content = req.cards_content.strip()
     with open(preview_path, "w", encoding="utf-8") as f:
-        f.write(req.cards_content.strip())
+        f.write(cards_content)
     rel_path = f"output/{EDIT_PREVIEW_DIR}/cards_preview_{ts}.md"
     run_output = os.path.join(output_dir, "simulator_output")
 
@@ -177,9 +273,11 @@ def run_simulation_from_content(
         student_config=npc_student_config,
     )
     runner = SessionRunner(config)
-    runner.load_cards(preview_path)
+    # 正文已在内存中，直接解析，不再从刚写入的预览文件读回
+    runner.load_cards_from_content(cards_content, preview_path)
     runner.setup()
     log = runner.run()
+    dialogue = runner.get_dialogue_for_evaluation()
     result = {
         "session_id": log.session_id,
         "start_time": log.start_time,
@@ -187,21 +285,15 @@ def run_simulation_from_content(
         "config": log.config,
         "cards_used": log.cards_used,
         "preview_path": rel_path,
-        "dialogue": [
-            {"turn": d.turn_number, "card_id": d.card_id, "speaker": d.speaker, "content": d.content}
-            for d in log.dialogue
-        ],
+        "dialogue": dialogue,
         "summary": log.summary,
     }
     if req.run_evaluation and log.summary.get("status") == "completed":
         try:
-            evaluator = EvaluatorFactory.create_from_env()
-            dialogue = runner.get_dialogue_for_evaluation()
+            evaluator = EvaluatorFactory.get_shared_from_env()
             report = evaluator.evaluate(dialogue, session_id=log.session_id)
-            reports_dir = os.path.join(run_output, "reports")
-            os.makedirs(reports_dir, exist_ok=True)
-            evaluator.save_report(report, reports_dir)
+            _save_report_async(evaluator, report, os.path.join(run_output, "reports"))
             result["evaluation"] = report.to_dict()
         except Exception as e:
             result["evaluation_error"] = str(e)
-    return result
+    return FastJSONResponse(result)
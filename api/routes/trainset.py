@@ -4,7 +4,9 @@ Trainset 构建与校验 API：供 DSPy 优化前使用。
 路径均相对当前工作区（input/、output/）。
 支持 trainset 库（output/trainset_lib/）的列表与删除。
 """
+import asyncio
 import os
+from operator import itemgetter
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from typing import Optional
@@ -19,17 +21,23 @@ from api.workspace import (
     resolve_output_path,
     resolve_workspace_path,
     list_dir_files_with_mtime,
+    stat_or_none,
 )
 from api.routes.llm_config import require_llm_config
 from api.exceptions import BadRequestError, ConfigError, NotFoundError, LLMError
 from generators.trainset_builder import (
+    TRAINSET_LIB_EXT,
+    TRAINSET_LIB_SUBDIR,
     build_trainset_from_path,
     save_trainset,
     load_trainset,
     check_trainset_file,
 )
 
-TRAINSET_LIB_SUBDIR = "trainset_lib"
+# 构建/校验（含配置读取、路径检查、逐文件 LLM 调用与文件读写）整体放到线程池执行，
+# 以免阻塞事件循环；所有工作区共享同一并发上限，避免突发请求占满线程池。
+TRAINSET_IO_MAX_CONCURRENCY = 4
+_trainset_io_semaphore = asyncio.Semaphore(TRAINSET_IO_MAX_CONCURRENCY)
 
 
 class BuildTrainsetRequest(BaseModel):
@@ -37,13 +45,12 @@ class BuildTrainsetRequest(BaseModel):
     output_path: str = "output/optimizer/trainset.json"
 
 
-@router.post("/build")
-def build_trainset(req: BuildTrainsetRequest, workspace_id: str = Depends(require_workspace_owned)):
-    """从剧本文件或目录构建 trainset，保存为 JSON。使用工作区 LLM 配置。"""
+def _build_trainset_sync(req: BuildTrainsetRequest, workspace_id: str) -> dict:
+    """构建并保存 trainset 的完整同步流程（含配置读取与路径检查，在线程池中调用）。"""
     llm = require_llm_config(workspace_id)
     wm = WorkspaceManager(workspace_id)
     abs_input = wm.resolve_input_path(req.input_path)
-    if not os.path.exists(abs_input):
+    if stat_or_none(abs_input) is None:
         raise NotFoundError("数据来源不存在", details={"path": req.input_path})
     abs_output = wm.resolve_output_path(req.output_path)
     try:
@@ -65,13 +72,19 @@ def build_trainset(req: BuildTrainsetRequest, workspace_id: str = Depends(requir
     }
 
 
+@router.post("/build")
+async def build_trainset(req: BuildTrainsetRequest, workspace_id: str = Depends(require_workspace_owned)):
+    """从剧本文件或目录构建 trainset，保存为 JSON。使用工作区 LLM 配置。"""
+    async with _trainset_io_semaphore:
+        return await asyncio.to_thread(_build_trainset_sync, req, workspace_id)
+
+
 class ValidateTrainsetRequest(BaseModel):
     trainset_path: str  # 如 output/optimizer/trainset.json
 
 
-@router.post("/validate")
-def validate_trainset(req: ValidateTrainsetRequest, workspace_id: str = Depends(require_workspace_owned)):
-    """校验 trainset JSON 结构与评估标准对齐。"""
+def _validate_trainset_sync(req: ValidateTrainsetRequest, workspace_id: str) -> dict:
+    """校验 trainset 的完整同步流程（在线程池中调用）。"""
     wm = WorkspaceManager(workspace_id)
     abs_path = wm.resolve_output_path(req.trainset_path, must_exist=True)
     try:
@@ -81,6 +94,13 @@ def validate_trainset(req: ValidateTrainsetRequest, workspace_id: str = Depends(
     return {"valid": valid, "messages": messages}
 
 
+@router.post("/validate")
+async def validate_trainset(req: ValidateTrainsetRequest, workspace_id: str = Depends(require_workspace_owned)):
+    """校验 trainset JSON 结构与评估标准对齐。"""
+    async with _trainset_io_semaphore:
+        return await asyncio.to_thread(_validate_trainset_sync, req, workspace_id)
+
+
 @router.get("/list")
 def list_trainset_lib(workspace_id: str = Depends(require_workspace_owned)):
     """
@@ -92,8 +112,8 @@ def list_trainset_lib(workspace_id: str = Depends(require_workspace_owned)):
     path_prefix = f"output/{TRAINSET_LIB_SUBDIR}/"
     if not os.path.isdir(lib_dir):
         return {"files": []}
-    files = list_dir_files_with_mtime(lib_dir, path_prefix, allowed_ext={".json"})
-    files.sort(key=lambda x: x["mtime"], reverse=True)
+    files = list_dir_files_with_mtime(lib_dir, path_prefix, allowed_ext=TRAINSET_LIB_EXT)
+    files.sort(key=itemgetter("mtime"), reverse=True)
     return {"files": files}
 
 
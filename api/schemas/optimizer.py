@@ -1,6 +1,6 @@
 from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 
 class OptimizeRequest(BaseModel):
@@ -26,3 +26,10 @@ class OptimizeRequest(BaseModel):
     verbose: bool = False
     num_threads: Optional[int] = None
 
+    @field_validator("model_type")
+    @classmethod
+    def _normalize_model_type(cls, v: Optional[str]) -> Optional[str]:
+        """model_type 在校验时统一转小写，下游直接比较，无需再 .lower()。"""
+        if v is None:
+            return None
+        return v.strip().lower() or None
@@ -2,18 +2,25 @@ import hashlib
 import json
 import os
 import pickle
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Callable, Optional
 
 from config import DSPY_OPTIMIZER_CONFIG
-from generators.trainset_builder import check_trainset_file
+from generators.trainset_builder import TRAINSET_LIB_EXT, TRAINSET_LIB_SUBDIR, check_trainset_file
 from generators.dspy_optimizer import run_optimize_dspy
-from api.workspace import WorkspaceManager, get_project_dirs, list_dir_files_with_mtime
+from api.workspace import WorkspaceManager, get_project_dirs, newest_file, stat_or_none
 from api.exceptions import BadRequestError, ConfigError, NotFoundError
+from api.utils import json_codec
 
 from api.schemas.optimizer import OptimizeRequest
 
-TRAINSET_LIB_SUBDIR = "trainset_lib"
+try:
+    from generators import DSPY_AVAILABLE
+except Exception:
+    DSPY_AVAILABLE = False
 
 
 def _default_trainset_path(workspace_id: str) -> Optional[str]:
@@ -23,11 +30,7 @@ def _default_trainset_path(workspace_id: str) -> Optional[str]:
     if not os.path.isdir(lib_dir):
         return None
     path_prefix = f"output/{TRAINSET_LIB_SUBDIR}/"
-    files = list_dir_files_with_mtime(lib_dir, path_prefix, allowed_ext={".json"})
-    if not files:
-        return None
-    files.sort(key=lambda x: x["mtime"], reverse=True)
-    return files[0]["path"]
+    return newest_file(lib_dir, path_prefix, allowed_ext=TRAINSET_LIB_EXT)
 
 
 DSPY_CACHE_SUBDIR = "dspy_cache"
@@ -35,20 +38,125 @@ RUN_MANIFEST_SUBDIR = "runs"
 ARTIFACT_SUBDIR = "artifacts"
 
 
+_HASH_CHUNK_SIZE = 1 << 20
+
+# blake3 为可选依赖（pip install blake3）：比 SHA256 快数倍，仅用作本地缓存键。
+# 其摘要带 "b3_" 前缀，与历史上无前缀的 SHA256 缓存键不会混淆。
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+
 def _trainset_content_hash(trainset_abs: str) -> Optional[str]:
-    """计算 trainset 文件内容的 SHA256 哈希。"""
+    """计算 trainset 文件内容哈希（流式读取，不把整个文件读入内存）。装有 blake3 时用 BLAKE3，否则 SHA256。"""
     try:
-        with open(trainset_abs, "rb") as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        with open(trainset_abs, "rb", buffering=0) as f:
+            if _blake3 is not None:
+                h = _blake3()
+                prefix = "b3_"
+            elif hasattr(hashlib, "file_digest"):  # Python 3.11+
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            else:
+                h = hashlib.sha256()
+                prefix = ""
+            buf = bytearray(_HASH_CHUNK_SIZE)
+            mv = memoryview(buf)
+            while True:
+                n = f.readinto(mv)
+                if not n:
+                    break
+                h.update(mv[:n])
+            return prefix + h.hexdigest()
     except Exception:
         return None
 
 
-def _dspy_cache_path(output_dir: str, trainset_hash: str) -> str:
-    """dspy_cache 目录下以 hash 命名的缓存文件路径。"""
+# dspy_cache 下的 stat 指纹索引：(size, mtime_ns, inode) -> 内容哈希，文件未变时免去整文件哈希
+STAT_INDEX_FILE = "_stat_index.json"
+_STAT_INDEX_MAX_ENTRIES = 256
+
+
+def _stat_fingerprint(st: os.stat_result) -> str:
+    return f"{st.st_size}:{st.st_mtime_ns}:{st.st_ino}"
+
+
+def _trainset_hash_cached(output_dir: str, trainset_abs: str, st: os.stat_result) -> Optional[str]:
+    """先按 stat 指纹查索引，命中则直接返回内容哈希；未命中再计算哈希并写回索引。"""
     cache_dir = os.path.join(output_dir, "optimizer", DSPY_CACHE_SUBDIR)
-    os.makedirs(cache_dir, exist_ok=True)
-    return os.path.join(cache_dir, f"{trainset_hash}.json")
+    index_path = os.path.join(cache_dir, STAT_INDEX_FILE)
+    fingerprint = _stat_fingerprint(st)
+    try:
+        with open(index_path, "rb") as f:
+            index = json_codec.loads(f.read())
+        if not isinstance(index, dict):
+            index = {}
+    except Exception:
+        index = {}
+    cached = index.get(fingerprint)
+    if cached:
+        return cached
+
+    trainset_hash = _trainset_content_hash(trainset_abs)
+    if trainset_hash:
+        index[fingerprint] = trainset_hash
+        # 只保留最近写入的若干条，避免索引无限增长
+        if len(index) > _STAT_INDEX_MAX_ENTRIES:
+            index = dict(list(index.items())[-_STAT_INDEX_MAX_ENTRIES:])
+        tmp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(json_codec.dumps(index))
+            os.replace(tmp_path, index_path)
+        except Exception:
+            pass
+    return trainset_hash
+
+
+# DSPy 结果缓存索引：每次优化追加一行 JSON，同一 trainset_hash 以最后一行为准
+DSPY_CACHE_INDEX_FILE = "dspy_cache.jsonl"
+
+
+def _dspy_cache_index_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "optimizer", DSPY_CACHE_INDEX_FILE)
+
+
+def _legacy_dspy_cache_path(output_dir: str, trainset_hash: str) -> str:
+    """旧版按 hash 单独存放的缓存文件路径（仅读取兼容）。"""
+    return os.path.join(output_dir, "optimizer", DSPY_CACHE_SUBDIR, f"{trainset_hash}.json")
+
+
+def _load_dspy_cache_entry(output_dir: str, trainset_hash: str) -> Optional[dict]:
+    """查找 trainset_hash 对应的缓存记录；同一 hash 以索引中最后一行为准。"""
+    entries: dict[str, dict] = {}
+    try:
+        with open(_dspy_cache_index_path(output_dir), "rb") as f:
+            for line in f:
+                try:
+                    item = json_codec.loads(line)
+                except Exception:
+                    continue  # 跳过写入中断产生的残行
+                if isinstance(item, dict) and item.get("trainset_hash"):
+                    entries[item["trainset_hash"]] = item
+    except OSError:
+        entries = {}
+    entry = entries.get(trainset_hash)
+    if entry is not None:
+        return entry
+    try:
+        with open(_legacy_dspy_cache_path(output_dir, trainset_hash), "rb") as f:
+            return json_codec.loads(f.read())
+    except Exception:
+        return None
+
+
+def _append_dspy_cache_entry(output_dir: str, payload: dict) -> None:
+    """向缓存索引追加一条记录（单次 O_APPEND 写入，不重写已有内容）。"""
+    index_path = _dspy_cache_index_path(output_dir)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    with open(index_path, "ab") as f:
+        f.write(json_codec.dumps(payload) + b"\n")
 
 
 def _to_output_rel(abs_path: str, output_dir: str) -> str:
@@ -99,6 +207,9 @@ def _write_run_manifest(output_dir: str, run_id: str, payload: dict[str, Any]) -
     return _to_output_rel(abs_path, output_dir)
 
 
+# trainset 哈希后台线程池（hashlib 计算期间释放 GIL，可与校验真正并行）
+_HASH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="trainset-hash")
+
 ProgressCallback = Callable[[int, int, str], None]
 
 
@@ -108,19 +219,14 @@ def run_optimizer_core(
     progress_callback: Optional[ProgressCallback] = None,
 ) -> dict:
     """核心优化流程：校验、解析路径、调用 DSPy 优化器并返回结果字典。"""
-    try:
-        from generators import DSPY_AVAILABLE  # type: ignore[attr-defined]
-    except Exception:
-        DSPY_AVAILABLE = False  # type: ignore[assignment]
-
     if not DSPY_AVAILABLE:
         raise ConfigError("未安装 dspy-ai，请运行 pip install dspy-ai")
 
     from api.routes.llm_config import require_llm_config
     llm = require_llm_config(workspace_id)
     wm = WorkspaceManager(workspace_id)
-    # 优先使用请求 / 工作区配置中的 model_type，默认退回豆包
-    model_type = (req.model_type or llm.get("model_type") or "doubao").lower()
+    # 优先使用请求 / 工作区配置中的 model_type，默认退回豆包（二者均已在校验 / 读取配置时转为小写）
+    model_type = req.model_type or llm.get("model_type") or "doubao"
     cfg = DSPY_OPTIMIZER_CONFIG
 
     trainset_path = req.trainset_path or _default_trainset_path(workspace_id)
@@ -130,11 +236,15 @@ def run_optimizer_core(
             details={},
         )
     trainset_abs = wm.resolve_output_path(trainset_path)
-    if not os.path.isfile(trainset_abs):
+    trainset_st = stat_or_none(trainset_abs)
+    if trainset_st is None or not stat.S_ISREG(trainset_st.st_mode):
         raise NotFoundError(
             "trainset 文件不存在。请确认路径或先上传剧本构建 trainset。",
             details={"path": trainset_path},
         )
+    # 内容哈希与结构校验都要完整读一遍 trainset，二者互不依赖：哈希放到后台线程与校验并行
+    _, output_dir, _ = get_project_dirs(workspace_id)
+    hash_future = _HASH_POOL.submit(_trainset_hash_cached, output_dir, trainset_abs, trainset_st)
     valid_trainset, trainset_messages = check_trainset_file(
         trainset_abs,
         strict=False,
@@ -148,14 +258,11 @@ def run_optimizer_core(
     trainset_warnings = [m for m in trainset_messages if m.startswith("[建议]")]
 
     # 缓存：按 trainset 内容 hash 判断是否已跑过，命中则直接返回上次结果
-    _, output_dir, _ = get_project_dirs(workspace_id)
-    trainset_hash = _trainset_content_hash(trainset_abs)
+    trainset_hash = hash_future.result()
     if not req.no_cache and trainset_hash:
-        cache_file = _dspy_cache_path(output_dir, trainset_hash)
-        if os.path.isfile(cache_file):
+        cache_data = _load_dspy_cache_entry(output_dir, trainset_hash)
+        if cache_data:
             try:
-                with open(cache_file, "r", encoding="utf-8") as f:
-                    cache_data = json.load(f)
                 if cache_data.get("trainset_hash") == trainset_hash:
                     return {
                         "message": "命中缓存，未重跑优化。",
@@ -255,7 +362,6 @@ def run_optimizer_core(
     # 写入缓存，便于下次同一 trainset 直接命中
     if trainset_hash:
         try:
-            cache_file = _dspy_cache_path(output_dir, trainset_hash)
             cache_payload = {
                 "trainset_path": trainset_path,
                 "trainset_hash": trainset_hash,
@@ -267,8 +373,7 @@ def run_optimizer_core(
                 "trainset_warnings": trainset_warnings[:20],
                 "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             }
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_payload, f, ensure_ascii=False, indent=2)
+            _append_dspy_cache_entry(output_dir, cache_payload)
         except Exception:
             pass
 
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 编解码：优先使用 orjson（可选依赖，C 实现），未安装时回退到标准库 json。
+输出统一为 UTF-8 bytes，中文不转义（等价于 ensure_ascii=False）。
+"""
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+# orjson 为可选依赖：pip install orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """将对象编码为 UTF-8 JSON bytes。默认紧凑格式；indent=True 时缩进 2 空格（写入便于人工查看的文件）。"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2) if indent else orjson.dumps(obj)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """解析 JSON bytes/str。"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """直接编码为 JSON 的响应，跳过 FastAPI 对返回值的 jsonable_encoder 遍历。仅用于已是纯 JSON 类型的数据。"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -3,14 +3,19 @@
 工作区隔离：按 X-Workspace-Id 区分用户，input/output 互不影响。
 支持当前项目（课程/小项目）切换，路径可解析到项目子目录。
 """
-import json
+import base64
 import os
+import posixpath
 import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from operator import itemgetter
 from typing import Optional
 
 from fastapi import Header
 
 from api.exceptions import BadRequestError, NotFoundError
+from api.utils import json_codec
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 _WORKSPACES_DIR = os.path.join(_ROOT, "workspaces")
@@ -20,10 +25,23 @@ _CURRENT_PROJECT_FILE = "current_project.json"
 # 允许：中文、英文、数字、下划线、短横线；1~64 字符
 WORKSPACE_ID_PATTERN = re.compile(r"^[\w\u4e00-\u9fff\-]{1,64}$", re.UNICODE)
 
+# 纯 ASCII 项目名的快速校验字符集（与 WORKSPACE_ID_PATTERN 的 ASCII 子集一致），常见情况不必进正则
+_WORKSPACE_ID_ASCII_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-")
+
 # 用于拼接目录时做安全替换：Windows 非法文件名字符
 _FS_UNSAFE = re.compile(r'[\\/:*?"<>|]')
 
+# 请求头是否形如 Base64（前端对非 ASCII 项目名的编码）
+_B64_RE = re.compile(r"^[A-Za-z0-9+/]+=*$")
+
+# current_project.json 解析缓存：workspace_id -> ((mtime_ns, size), 解析结果或 None)
+_current_project_cache: dict[str, tuple[tuple[int, int], Optional[dict]]] = {}
+
+# get_project_dirs 缓存：workspace_id -> (current_project.json 的 (mtime_ns, size) 或 None, 结果三元组)
+_project_dirs_cache: dict[str, tuple[Optional[tuple[int, int]], tuple[str, str, str]]] = {}
 
+
+@lru_cache(maxsize=256)
 def _sanitize_workspace_dir(name: str) -> str:
     """将项目名中不可做目录名的字符替换为下划线，避免跨平台问题。"""
     return _FS_UNSAFE.sub("_", name).strip() or "default"
@@ -33,10 +51,12 @@ def _decode_workspace_id_header(value: Optional[str]) -> str:
     """解码请求头：前端可能对中文等非 ASCII 做 Base64 编码（HTTP 头仅允许 ISO-8859-1）。"""
     if not value or not value.strip():
         return (value or "").strip()
-    import base64
     s = value.strip()
+    # 非 ASCII 的值一定不是 Base64，跳过正则与解码
+    if not s.isascii():
+        return s
     try:
-        if re.match(r"^[A-Za-z0-9+/]+=*$", s) and len(s) % 4 in (0, 2, 3):
+        if _B64_RE.match(s) and len(s) % 4 in (0, 2, 3):
             decoded = base64.b64decode(s).decode("utf-8")
             if decoded:
                 return decoded
@@ -52,6 +72,8 @@ def get_workspace_id(x_workspace_id: str | None = Header(None, alias="X-Workspac
             "缺少请求头 X-Workspace-Id。请从带 /w/项目名 的地址进入（如 /w/编译原理）。"
         )
     wid = _decode_workspace_id_header(x_workspace_id)
+    if 0 < len(wid) <= 64 and _WORKSPACE_ID_ASCII_CHARS.issuperset(wid):
+        return wid
     if not wid or not WORKSPACE_ID_PATTERN.match(wid):
         raise BadRequestError(
             "X-Workspace-Id 格式非法（允许中文、英文、数字、下划线、短横线，1~64 位，且不能含 / \\ 等路径字符）"
@@ -59,8 +81,12 @@ def get_workspace_id(x_workspace_id: str | None = Header(None, alias="X-Workspac
     return wid
 
 
+@lru_cache(maxsize=256)
 def get_workspace_dirs(workspace_id: str) -> tuple[str, str, str]:
-    """返回 (input_dir, output_dir, workspace_root)。目录不存在则创建。"""
+    """返回 (input_dir, output_dir, workspace_root)。目录不存在则创建。
+
+    结果按 workspace_id 缓存：目录只在首次调用时创建，之后不再重复 makedirs。
+    """
     dir_name = _sanitize_workspace_dir(workspace_id)
     workspace_root = os.path.join(_WORKSPACES_DIR, dir_name)
     input_dir = os.path.join(workspace_root, "input")
@@ -78,6 +104,14 @@ def get_workspace_file_path(workspace_id: str, filename: str) -> str:
     return os.path.join(workspace_root, filename)
 
 
+def stat_or_none(path: str) -> Optional[os.stat_result]:
+    """对 path 做一次 os.stat，不存在返回 None。调用方据 st_mode 判断文件/目录，免去重复的 exists/isfile。"""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
 def safe_relative(path: str, base: str) -> Optional[str]:
     """返回 path 相对 base 的路径（正斜杠），若 path 不在 base 下则返回 None。"""
     try:
@@ -96,24 +130,95 @@ def list_dir_files(
 ) -> list:
     """
     递归列出 root_dir 下文件，返回 [{"path": path_prefix+rel, "name": name}, ...]。
-    allowed_ext 为 None 时不过滤扩展名；否则只保留扩展名在 allowed_ext 中的文件。
+    allowed_ext 为 None 时不过滤扩展名；否则只保留扩展名在 allowed_ext 中的文件。root_dir 不存在时返回空列表。
     """
-    if not os.path.isdir(root_dir):
-        return []
-    out = []
-    for root, _, names in os.walk(root_dir):
-        for name in sorted(names) if allowed_ext is None else names:
-            ext = os.path.splitext(name)[1].lower()
-            if allowed_ext is not None and ext not in allowed_ext:
-                continue
-            full = os.path.join(root, name)
-            rel = safe_relative(full, root_dir)
-            if rel:
-                out.append({"path": path_prefix + rel.replace("\\", "/"), "name": name})
-    out.sort(key=lambda x: x["path"])
+    out = [
+        {"path": path_prefix + rel, "name": entry.name}
+        for rel, entry in _scan_files(root_dir, allowed_ext)
+    ]
     return out
 
 
+def _ext_allowed(name: str, allowed_ext: Optional[set]) -> bool:
+    """按文件名末尾扩展名（小写）判断是否在 allowed_ext 中；allowed_ext 为 None 时不过滤。"""
+    if allowed_ext is None:
+        return True
+    dot = name.rfind(".")
+    # 与 os.path.splitext 一致：以点开头的隐藏文件名（如 .json）视为无扩展名
+    if dot <= 0:
+        return "" in allowed_ext
+    return name[dot:].lower() in allowed_ext
+
+
+# 根目录下子目录数达到该值时，改用线程池并发遍历（scandir/stat 为 I/O 系统调用，期间释放 GIL）
+_PARALLEL_SCAN_MIN_DIRS = 8
+_PARALLEL_SCAN_WORKERS = 4
+
+
+def _scan_dir(
+    path: str,
+    rel_prefix: str,
+    allowed_ext: Optional[set],
+    with_stat: bool,
+) -> tuple[list[tuple[str, os.DirEntry]], list[tuple[str, str]]]:
+    """扫描单个目录，返回 (符合扩展名的文件 [(相对路径, DirEntry)], 子目录 [(绝对路径, 相对前缀)])。
+
+    with_stat 时顺带取 lstat（结果缓存在 DirEntry 上，调用方再取不会重复系统调用）。
+    """
+    files: list[tuple[str, os.DirEntry]] = []
+    dirs: list[tuple[str, str]] = []
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return files, dirs
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append((entry.path, rel_prefix + entry.name + "/"))
+            elif entry.is_file() and _ext_allowed(entry.name, allowed_ext):
+                if with_stat:
+                    try:
+                        entry.stat(follow_symlinks=False)
+                    except OSError:
+                        pass
+                files.append((rel_prefix + entry.name, entry))
+    return files, dirs
+
+
+def _scan_files(
+    root_dir: str,
+    allowed_ext: Optional[set] = None,
+    with_stat: bool = False,
+) -> list[tuple[str, os.DirEntry]]:
+    """
+    用 os.scandir 递归遍历 root_dir，返回 [(相对路径（正斜杠）, DirEntry)]，按相对路径排序（收集完后只排一次）。
+    与 os.walk 默认行为一致：不跟随目录符号链接，无法读取的子目录跳过。
+    子目录较多时并发遍历，目录树小时串行，避免线程池开销。
+    """
+    files, pending = _scan_dir(root_dir, "", allowed_ext, with_stat)
+    if len(pending) < _PARALLEL_SCAN_MIN_DIRS:
+        while pending:
+            path, rel_prefix = pending.pop()
+            sub_files, sub_dirs = _scan_dir(path, rel_prefix, allowed_ext, with_stat)
+            files.extend(sub_files)
+            pending.extend(sub_dirs)
+        files.sort(key=itemgetter(0))
+        return files
+
+    with ThreadPoolExecutor(max_workers=_PARALLEL_SCAN_WORKERS, thread_name_prefix="scandir") as ex:
+        futures = {ex.submit(_scan_dir, path, rel, allowed_ext, with_stat) for path, rel in pending}
+        while futures:
+            done, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in done:
+                sub_files, sub_dirs = fut.result()
+                files.extend(sub_files)
+                futures.update(
+                    ex.submit(_scan_dir, path, rel, allowed_ext, with_stat) for path, rel in sub_dirs
+                )
+    files.sort(key=itemgetter(0))
+    return files
+
+
 def list_dir_files_with_mtime(
     root_dir: str,
     path_prefix: str,
@@ -121,32 +226,42 @@ def list_dir_files_with_mtime(
 ) -> list:
     """
     递归列出 root_dir 下文件，返回 [{"path", "name", "mtime"}, ...]。
-    mtime 为修改时间戳（秒，用于按时间排序）。
+    mtime 为修改时间戳（秒，用于按时间排序）。root_dir 不存在时返回空列表。
     """
-    if not os.path.isdir(root_dir):
-        return []
     out = []
-    for root, _, names in os.walk(root_dir):
-        for name in sorted(names) if allowed_ext is None else names:
-            ext = os.path.splitext(name)[1].lower()
-            if allowed_ext is not None and ext not in allowed_ext:
-                continue
-            full = os.path.join(root, name)
-            rel = safe_relative(full, root_dir)
-            if rel:
-                try:
-                    mtime = os.path.getmtime(full)
-                except OSError:
-                    mtime = 0
-                out.append({
-                    "path": path_prefix + rel.replace("\\", "/"),
-                    "name": name,
-                    "mtime": int(mtime),
-                })
-    out.sort(key=lambda x: x["path"])
+    for rel, entry in _scan_files(root_dir, allowed_ext, with_stat=True):
+        try:
+            mtime_ns = entry.stat(follow_symlinks=False).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        out.append({
+            "path": path_prefix + rel,
+            "name": entry.name,
+            "mtime": mtime_ns // 1_000_000_000,
+        })
     return out
 
 
+def newest_file(
+    root_dir: str,
+    path_prefix: str,
+    allowed_ext: Optional[set] = None,
+) -> Optional[str]:
+    """
+    返回 root_dir 下（递归）修改时间最新的文件路径（path_prefix+rel），无文件时返回 None。
+    按 st_mtime_ns 比较，不构造列表字典；mtime 相同时取相对路径靠前者。
+    """
+    best_rel, best_ns = None, -1
+    for rel, entry in _scan_files(root_dir, allowed_ext, with_stat=True):
+        try:
+            mtime_ns = entry.stat(follow_symlinks=False).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        if mtime_ns > best_ns:
+            best_rel, best_ns = rel, mtime_ns
+    return None if best_rel is None else path_prefix + best_rel
+
+
 def save_upload_to_dir(
     root_dir: str,
     content: bytes,
@@ -189,24 +304,36 @@ def _safe_relative_path(part: str) -> bool:
     return True
 
 
-def get_current_project(workspace_id: str) -> Optional[dict]:
-    """读取当前项目配置。返回 None 或 {"course": str, "project": str}。"""
-    input_dir, _, workspace_root = get_workspace_dirs(workspace_id)
-    path = os.path.join(workspace_root, _CURRENT_PROJECT_FILE)
-    if not os.path.isfile(path):
+def _load_current_project(workspace_id: str, path: str, st: Optional[os.stat_result]) -> Optional[dict]:
+    """按 (mtime_ns, size) 缓存 current_project.json 的解析结果；st 为该文件的 stat（不存在为 None）。"""
+    if st is None:
         return None
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _current_project_cache.get(workspace_id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    result = None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = json_codec.loads(f.read())
         course = (data.get("course") or "").strip()
         project = (data.get("project") or "").strip()
-        if not course or not _safe_relative_path(course):
-            return None
-        if not _safe_relative_path(project):
-            project = ""
-        return {"course": course, "project": project}
+        if course and _safe_relative_path(course):
+            if not _safe_relative_path(project):
+                project = ""
+            result = {"course": course, "project": project}
     except Exception:
-        return None
+        result = None
+    _current_project_cache[workspace_id] = (key, result)
+    return result
+
+
+def get_current_project(workspace_id: str) -> Optional[dict]:
+    """读取当前项目配置。返回 None 或 {"course": str, "project": str}。文件未变化时不重复解析。"""
+    _, _, workspace_root = get_workspace_dirs(workspace_id)
+    path = os.path.join(workspace_root, _CURRENT_PROJECT_FILE)
+    current = _load_current_project(workspace_id, path, stat_or_none(path))
+    return dict(current) if current else None
 
 
 def set_current_project(workspace_id: str, course: str, project: str = "") -> None:
@@ -219,8 +346,15 @@ def set_current_project(workspace_id: str, course: str, project: str = "") -> No
     dir_name = _sanitize_workspace_dir(workspace_id)
     workspace_root = os.path.join(_WORKSPACES_DIR, dir_name)
     path = os.path.join(workspace_root, _CURRENT_PROJECT_FILE)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"course": course, "project": project}, f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(json_codec.dumps({"course": course, "project": project}, indent=True))
+    # 写入后直接用新 stat 回填解析缓存，下一次读取无需重新解析
+    st = stat_or_none(path)
+    if st is not None:
+        _current_project_cache[workspace_id] = ((st.st_mtime_ns, st.st_size), {"course": course, "project": project})
+    else:
+        _current_project_cache.pop(workspace_id, None)
+    _project_dirs_cache.pop(workspace_id, None)
 
 
 def list_projects(workspace_id: str) -> list[dict]:
@@ -231,15 +365,10 @@ def list_projects(workspace_id: str) -> list[dict]:
     """
     input_dir, _, _ = get_workspace_dirs(workspace_id)
     result = []
-    if not os.path.isdir(input_dir):
-        return result
-    for course in sorted(os.listdir(input_dir)):
-        course_path = os.path.join(input_dir, course)
-        if not os.path.isdir(course_path) or not _safe_relative_path(course):
-            continue
-        subdirs = [d for d in os.listdir(course_path) if os.path.isdir(os.path.join(course_path, d)) and _safe_relative_path(d)]
+    for course in _safe_subdir_names(input_dir):
+        subdirs = _safe_subdir_names(os.path.join(input_dir, course))
         if subdirs:
-            for proj in sorted(subdirs):
+            for proj in subdirs:
                 result.append({
                     "course": course,
                     "project": proj,
@@ -250,15 +379,35 @@ def list_projects(workspace_id: str) -> list[dict]:
     return result
 
 
+def _safe_subdir_names(path: str) -> list[str]:
+    """返回 path 下名称合法的子目录名（排序）。用 scandir 的 d_type 判断目录，免去逐项 isdir 的 stat；path 不存在时返回空列表。"""
+    try:
+        with os.scandir(path) as it:
+            names = [e.name for e in it if e.is_dir() and _safe_relative_path(e.name)]
+    except OSError:
+        return []
+    names.sort()
+    return names
+
+
 def get_project_dirs(workspace_id: str) -> tuple[str, str, str]:
     """
     若已设置当前项目，返回 (project_input_dir, project_output_dir, workspace_root)；
     否则与 get_workspace_dirs 一致，返回 (input_dir, output_dir, workspace_root)。
     """
     input_dir, output_dir, workspace_root = get_workspace_dirs(workspace_id)
-    current = get_current_project(workspace_id)
+    # current_project.json 未变化时直接复用上次结果，免去读 JSON、路径规范化与 makedirs
+    current_path = os.path.join(workspace_root, _CURRENT_PROJECT_FILE)
+    st = stat_or_none(current_path)
+    key = (st.st_mtime_ns, st.st_size) if st is not None else None
+    cached = _project_dirs_cache.get(workspace_id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    current = _load_current_project(workspace_id, current_path, st)
     if not current:
-        return input_dir, output_dir, workspace_root
+        result = (input_dir, output_dir, workspace_root)
+        _project_dirs_cache[workspace_id] = (key, result)
+        return result
     course = current["course"]
     project = (current["project"] or "").strip()
     if project:
@@ -273,45 +422,73 @@ def get_project_dirs(workspace_id: str) -> tuple[str, str, str]:
         raise BadRequestError("当前项目路径非法")
     os.makedirs(pin, exist_ok=True)
     os.makedirs(pout, exist_ok=True)
-    return pin, pout, workspace_root
+    result = (pin, pout, workspace_root)
+    _project_dirs_cache[workspace_id] = (key, result)
+    return result
+
+
+def _clean_rel_path(path: str) -> str:
+    """去首尾空白、统一为正斜杠并去掉开头的 /。单字符 str.replace 比 str.translate 快一个数量级，保持此写法。"""
+    return path.strip().replace("\\", "/").lstrip("/")
 
 
 def normalize_output_rel(path: str) -> str:
     """将 path 规范化为带 output/ 前缀的相对路径（正斜杠）。"""
-    rel = path.strip().replace("\\", "/").lstrip("/")
+    rel = _clean_rel_path(path)
     if not rel.startswith("output/"):
         rel = "output/" + rel
     return rel
 
 
-def resolve_workspace_path(
+def _resolve_clean_path(
     workspace_id: str,
+    path: str,
     relative_path: str,
-    kind: str = "output",
-    must_exist: bool = False,
+    kind: str,
+    must_exist: bool,
 ) -> str:
-    """
-    将相对路径（如 output/xxx.md 或 xxx.md）解析为工作区内的绝对路径。
-    若 must_exist=True 且路径不存在，抛出 NotFoundError。
-    """
+    """resolve_workspace_path 的实现；path 为已经 _clean_rel_path 处理过的相对路径。"""
     project_input, project_output, _ = get_project_dirs(workspace_id)
+    # get_project_dirs 返回的目录均已规范化，可直接作为前缀比较的基准
     base = project_output if kind == "output" else project_input
-    path = relative_path.strip().replace("\\", "/").lstrip("/")
     if path.startswith("input/"):
         path = path[6:]
         base = project_input
     elif path.startswith("output/"):
         path = path[7:]
         base = project_output
-    full = os.path.normpath(os.path.join(base, path))
-    base_abs = os.path.normpath(base)
-    if not (full == base_abs or full.startswith(base_abs + os.sep)):
+    # 相对部分已是正斜杠形式，用 posixpath 一次规范化；仍以 .. 或 / 开头即越界
+    rel = posixpath.normpath(path) if path else "."
+    if rel == ".":
+        full = base
+    elif rel == ".." or rel.startswith("../") or rel.startswith("/"):
         raise BadRequestError("路径不能超出工作区", details={"path": relative_path})
-    if must_exist and not os.path.exists(full):
+    elif os.sep == "/":
+        # base 已规范化且不以分隔符结尾，rel 已排除越界形式：直接拼接即是规范路径，无需再做前缀比较
+        full = base + "/" + rel
+    else:
+        full = os.path.join(base, rel.replace("/", os.sep))
+        # Windows 下 rel 可能带盘符（如 C:x），join 后会脱离 base；兜底做一次前缀检查
+        if not full.startswith(base + os.sep):
+            raise BadRequestError("路径不能超出工作区", details={"path": relative_path})
+    if must_exist and stat_or_none(full) is None:
         raise NotFoundError("文件或目录不存在", details={"path": relative_path, "kind": kind})
     return full
 
 
+def resolve_workspace_path(
+    workspace_id: str,
+    relative_path: str,
+    kind: str = "output",
+    must_exist: bool = False,
+) -> str:
+    """
+    将相对路径（如 output/xxx.md 或 xxx.md）解析为工作区内的绝对路径。
+    若 must_exist=True 且路径不存在，抛出 NotFoundError。
+    """
+    return _resolve_clean_path(workspace_id, _clean_rel_path(relative_path), relative_path, kind, must_exist)
+
+
 def resolve_input_path(
     workspace_id: str,
     relative_path: str,
@@ -322,12 +499,12 @@ def resolve_input_path(
     若 relative_path 为 "input" 或空，返回当前项目的 input 目录；
     否则自动补 "input/" 前缀后解析。
     """
-    path = relative_path.strip().replace("\\", "/").lstrip("/")
+    path = _clean_rel_path(relative_path)
     if path in ("", "input", "input/"):
         return get_project_dirs(workspace_id)[0]
     if not path.startswith("input/"):
         path = "input/" + path
-    return resolve_workspace_path(workspace_id, path, kind="input", must_exist=must_exist)
+    return _resolve_clean_path(workspace_id, path, path, "input", must_exist)
 
 
 def resolve_output_path(
@@ -339,10 +516,10 @@ def resolve_output_path(
     将相对路径解析为工作区 output 下的绝对路径。
     自动补 "output/" 前缀后解析。
     """
-    path = relative_path.strip().replace("\\", "/").lstrip("/")
+    path = _clean_rel_path(relative_path)
     if not path.startswith("output/"):
         path = "output/" + path
-    return resolve_workspace_path(workspace_id, path, kind="output", must_exist=must_exist)
+    return _resolve_clean_path(workspace_id, path, path, "output", must_exist)
 
 
 class WorkspaceManager:
@@ -10,22 +10,75 @@
 import requests
 import json
 import time
-import random
-import string
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import secrets
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 
 
+# 连接池与重试：注入时对同一主机连续发起数十个请求，连接保持复用；
+# 5xx 与连接/读超时由 urllib3 在同一连接池内按退避重试（共 3 次尝试），不再手动 sleep 重连
+PLATFORM_POOL_MAXSIZE = 32
+PLATFORM_RETRY = Retry(
+    total=2,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),
+    raise_on_status=False,
+)
+
+# 批量注入时并发创建A类卡片的线程数（受平台并发限制，不宜过大）
+INJECT_MAX_WORKERS = 4
+
+# orjson 为可选依赖：请求体序列化 / 响应解析更快；未安装时回退标准库 json（同样输出 UTF-8，中文不转义）
+try:
+    import orjson
+
+    def _dumps_body(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads_body = orjson.loads
+except ImportError:
+    def _dumps_body(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads_body = json.loads
+
+
+# 直接报错、不再尝试解析响应的状态码
+_STATUS_ERRORS = {
+    401: "认证失败，请检查Cookie和Authorization是否有效或已过期",
+    403: "权限不足",
+}
+
+# 请求体中的固定字段：各接口只合并少量变化字段，不再每次重写整段字面量
+_STEP_DETAIL_TEMPLATE = {
+    "nodeType": "SCRIPT_NODE",
+    "knowledgeBaseSwitch": 0,
+    "searchEngineSwitch": 0,
+    "videoSwitch": 0,
+    "whiteBoardSwitch": 0,
+    "trainSubType": "ability",
+    "scriptStepCover": {},
+    "scriptStepResourceList": [],
+}
+_FLOW_TEMPLATE = {
+    "transitionHistoryNum": -1,  # -1 表示全部历史记录
+    "flowSettingType": "quick",
+    "isError": False,
+}
+
+
 def generate_step_id() -> str:
-    """生成唯一的步骤ID（节点ID）"""
-    chars = string.ascii_letters + string.digits + "_-"
-    return ''.join(random.choices(chars, k=21))
+    """生成唯一的步骤ID（节点ID）：21 位 URL 安全字符 [A-Za-z0-9_-]"""
+    return secrets.token_urlsafe(16)[:21]
 
 
 def generate_flow_id() -> str:
-    """生成唯一的连线ID"""
-    chars = string.ascii_letters + string.digits + "_-"
-    return ''.join(random.choices(chars, k=21))
+    """生成唯一的连线ID：21 位 URL 安全字符 [A-Za-z0-9_-]"""
+    return secrets.token_urlsafe(16)[:21]
 
 
 class PlatformAPIClient:
@@ -45,8 +98,11 @@ class PlatformAPIClient:
         self.start_node_id = config.get("start_node_id", "")  # 训练开始节点
         self.end_node_id = config.get("end_node_id", "")      # 训练结束节点
         
-        # 初始化session
+        # 初始化session（挂载带连接池与重试的 adapter）
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=PLATFORM_POOL_MAXSIZE, max_retries=PLATFORM_RETRY)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
         # 设置默认headers
         self.session.headers.update({
@@ -67,6 +123,10 @@ class PlatformAPIClient:
         if authorization:
             self.session.headers["Authorization"] = authorization
         
+        # 卡片位置跟踪（set_endpoints / reset_position 也会重置）
+        self._next_position = {"x": 200, "y": 100}
+        self._position_step = {"x": 0, "y": 200}  # 纵向排列
+        
         # API端点
         self.endpoints = {
             "create_step": "/teacher-course/abilityTrain/createScriptStep",
@@ -131,6 +191,13 @@ class PlatformAPIClient:
         self._next_position["y"] += self._position_step["y"]
         return pos
     
+    def _positions(self, n: int) -> List[dict]:
+        """一次性生成接下来 n 个卡片的位置（与连续调用 n 次 _get_next_position 结果一致）"""
+        x0, y0 = self._next_position["x"], self._next_position["y"]
+        dx, dy = self._position_step["x"], self._position_step["y"]
+        self._next_position = {"x": x0 + n * dx, "y": y0 + n * dy}
+        return [{"x": x0 + i * dx, "y": y0 + i * dy} for i in range(n)]
+    
     def reset_position(self, start_x: int = 570, start_y: int = 100):
         """重置卡片位置"""
         self._next_position = {"x": start_x, "y": start_y}
@@ -140,56 +207,42 @@ class PlatformAPIClient:
         method: str, 
         endpoint: str, 
         data: Optional[dict] = None,
-        retry_count: int = 3,
-        retry_delay: float = 1.0
     ) -> Dict[str, Any]:
-        """发送HTTP请求"""
+        """发送HTTP请求（5xx 与超时的重试由 session 上挂载的 PLATFORM_RETRY 完成）"""
         url = f"{self.base_url}{endpoint}"
         
-        for attempt in range(retry_count):
-            try:
-                response = self.session.request(
-                    method=method,
-                    url=url,
-                    json=data,
-                    timeout=30
-                )
-                
-                if response.status_code == 401:
-                    raise RuntimeError("认证失败，请检查Cookie和Authorization是否有效或已过期")
-                elif response.status_code == 403:
-                    raise RuntimeError("权限不足")
-                elif response.status_code >= 500:
-                    if attempt < retry_count - 1:
-                        time.sleep(retry_delay)
-                        continue
-                    raise RuntimeError(f"服务器错误: {response.status_code}")
-                
-                response.raise_for_status()
-                
-                try:
-                    result = response.json()
-                    if isinstance(result, dict):
-                        code = result.get("code") or result.get("status")
-                        if code and code != 200 and code != 0:
-                            msg = result.get("message") or result.get("msg") or "未知错误"
-                            raise RuntimeError(f"API错误: {msg}")
-                    return result
-                except json.JSONDecodeError:
-                    return {"raw_response": response.text}
-                    
-            except requests.exceptions.ConnectionError as e:
-                if attempt < retry_count - 1:
-                    time.sleep(retry_delay)
-                    continue
-                raise RuntimeError(f"连接错误: {e}")
-            except requests.exceptions.Timeout:
-                if attempt < retry_count - 1:
-                    time.sleep(retry_delay)
-                    continue
-                raise RuntimeError("请求超时")
-        
-        raise RuntimeError("请求失败，已达到最大重试次数")
+        try:
+            response = self.session.request(
+                method=method,
+                url=url,
+                data=_dumps_body(data) if data is not None else None,
+                timeout=30
+            )
+        except requests.exceptions.Timeout:
+            raise RuntimeError("请求超时")
+        except requests.exceptions.ConnectionError as e:
+            raise RuntimeError(f"连接错误: {e}")
+        
+        status = response.status_code
+        if status != 200:
+            msg = _STATUS_ERRORS.get(status)
+            if msg:
+                raise RuntimeError(msg)
+            if status >= 500:
+                raise RuntimeError(f"服务器错误: {status}")
+            response.raise_for_status()
+        
+        # 直接解析响应字节，不先解码成 response.text；非 JSON 时才回退文本
+        try:
+            result = _loads_body(response.content)
+        except ValueError:
+            return {"raw_response": response.text}
+        if isinstance(result, dict):
+            code = result.get("code") or result.get("status")
+            if code and code != 200 and code != 0:
+                msg = result.get("message") or result.get("msg") or "未知错误"
+                raise RuntimeError(f"API错误: {msg}")
+        return result
     
     # ========== A类卡片（节点）操作 ==========
     
@@ -241,20 +294,13 @@ class PlatformAPIClient:
                 "y": position.get("y", 100)
             },
             "stepDetailDTO": {
-                "nodeType": "SCRIPT_NODE",
+                **_STEP_DETAIL_TEMPLATE,
                 "stepName": step_name,
                 "description": description,
                 "prologue": prologue,
                 "modelId": model_id,
                 "llmPrompt": llm_prompt,
-                "knowledgeBaseSwitch": 0,
-                "searchEngineSwitch": 0,
-                "videoSwitch": 0,
-                "whiteBoardSwitch": 0,
-                "trainSubType": "ability",
                 "trainerName": trainer_name,
-                "scriptStepCover": {},
-                "scriptStepResourceList": [],
                 # 字段名已通过抓包确认
                 "interactiveRounds": interaction_rounds,  # 交互轮次
                 "historyRecordNum": history_num,          # 历史记录数量
@@ -276,20 +322,13 @@ class PlatformAPIClient:
             "libraryFolderId": "",
             "positionDTO": {"x": 570, "y": 300},
             "stepDetailDTO": {
-                "nodeType": "SCRIPT_NODE",
+                **_STEP_DETAIL_TEMPLATE,
                 "stepName": step_name,
                 "description": description,
                 "prologue": "",
                 "modelId": "",
                 "llmPrompt": llm_prompt,
-                "knowledgeBaseSwitch": 0,
-                "searchEngineSwitch": 0,
-                "videoSwitch": 0,
-                "whiteBoardSwitch": 0,
-                "trainSubType": "ability",
                 "trainerName": "",
-                "scriptStepCover": {},
-                "scriptStepResourceList": [],
                 "useTransitionDescriptionAsAudio": False,
                 "useVideoOriginalSoundAsAudio": False,
             }
@@ -320,6 +359,7 @@ class PlatformAPIClient:
             flow_id = generate_flow_id()
         
         request_body = {
+            **_FLOW_TEMPLATE,
             "trainTaskId": self.train_task_id,
             "flowId": flow_id,
             "scriptStepStartId": start_step_id,
@@ -327,10 +367,7 @@ class PlatformAPIClient:
             "scriptStepStartHandle": f"{start_step_id}-source-bottom",
             "scriptStepEndHandle": f"{end_step_id}-target-top",
             "transitionPrompt": "",  # 初始为空，后续通过edit_flow设置B类卡片内容
-            "transitionHistoryNum": -1,  # -1 表示全部历史记录
-            "flowSettingType": "quick",
             "isDefault": 1,  # 设置为默认跳转
-            "isError": False,
             "flowCondition": "1",  # 默认条件
             "flowConfiguration": {
                 "relation": "and",
@@ -370,6 +407,7 @@ class PlatformAPIClient:
         condition = flow_condition if flow_condition else ""
         
         request_body = {
+            **_FLOW_TEMPLATE,
             "trainTaskId": self.train_task_id,
             "flowId": flow_id,
             "scriptStepStartId": start_step_id,
@@ -377,10 +415,7 @@ class PlatformAPIClient:
             "scriptStepStartHandle": f"{start_step_id}-source-bottom",
             "scriptStepEndHandle": f"{end_step_id}-target-top",
             "transitionPrompt": transition_prompt,  # B类卡片内容在这里！
-            "transitionHistoryNum": -1,  # -1 表示全部历史记录
-            "flowSettingType": "quick",
             "isDefault": 1 if is_default else 0,  # 单线路情况下始终为1（勾选默认跳转）
-            "isError": False,
             "flowCondition": condition,  # 跳转条件（如"卡片1B"），可以为空
             "flowConfiguration": {
                 "relation": "and",
@@ -482,38 +517,58 @@ class PlatformAPIClient:
         current_step = 0
         
         # ========== 阶段1: 创建所有A类卡片（节点）==========
+        # 各节点创建互不依赖：先按顺序分配 step_id 与位置，再并发提交，结果按输入顺序收集
         print("\n[阶段1] 创建A类卡片（节点）...")
-        for i, card in enumerate(a_cards):
-            if progress_callback:
-                progress_callback(current_step, total_steps, f"创建A类卡片 {i+1}/{len(a_cards)}")
-            
-            try:
-                result = self.create_step(
-                    step_name=card.get("step_name", f"卡片{i+1}A"),
-                    llm_prompt=card.get("llm_prompt", ""),
-                    description=card.get("description", ""),
-                    prologue=card.get("prologue", ""),
-                    # 卡片配置参数（字段名已通过抓包确认）
-                    interaction_rounds=card.get("interaction_rounds", 5),
-                    model_id=card.get("model_id", ""),
-                    history_num=card.get("history_num", 0),
-                    trainer_name=card.get("trainer_name", ""),
-                )
-                step_id = result.get("_step_id")
-                step_ids.append(step_id)
-                print(f"  [OK] 创建节点 {i+1}: {step_id[:15]}... - {card.get('step_name', '')[:20]}")
-            except Exception as e:
-                print(f"  [失败] 创建节点 {i+1} 失败: {e}")
-                step_ids.append(None)
-            
-            current_step += 1
-            time.sleep(0.8)
+        positions = self._positions(len(a_cards))
+        planned_ids = [generate_step_id() for _ in a_cards]
+
+        def _create(i: int, card: dict) -> dict:
+            return self.create_step(
+                step_name=card.get("step_name", f"卡片{i+1}A"),
+                llm_prompt=card.get("llm_prompt", ""),
+                description=card.get("description", ""),
+                prologue=card.get("prologue", ""),
+                step_id=planned_ids[i],
+                position=positions[i],
+                # 卡片配置参数（字段名已通过抓包确认）
+                interaction_rounds=card.get("interaction_rounds", 5),
+                model_id=card.get("model_id", ""),
+                history_num=card.get("history_num", 0),
+                trainer_name=card.get("trainer_name", ""),
+            )
+
+        if progress_callback:
+            progress_callback(current_step, total_steps, f"创建A类卡片 0/{len(a_cards)}")
+        with ThreadPoolExecutor(max_workers=INJECT_MAX_WORKERS) as executor:
+            futures = [executor.submit(_create, i, card) for i, card in enumerate(a_cards)]
+            for i, (card, future) in enumerate(zip(a_cards, futures, strict=True)):
+                try:
+                    step_id = future.result().get("_step_id")
+                    step_ids.append(step_id)
+                    print(f"  [OK] 创建节点 {i+1}: {step_id[:15]}... - {card.get('step_name', '')[:20]}")
+                except Exception as e:
+                    print(f"  [失败] 创建节点 {i+1} 失败: {e}")
+                    step_ids.append(None)
+                current_step += 1
+                if progress_callback:
+                    progress_callback(current_step, total_steps, f"创建A类卡片 {i+1}/{len(a_cards)}")
+        
+        # 连线请求的节奏控制：两次请求的起始时间至少间隔 gap 秒；请求本身已耗时足够则不再 sleep
+        next_allowed = time.monotonic()
+
+        def _pace(gap: float) -> None:
+            nonlocal next_allowed
+            delay = next_allowed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_allowed = time.monotonic() + gap
         
         # ========== 阶段2: 从"训练开始"连接到第一个A类卡片 ==========
         print("\n[阶段2] 连接训练开始节点...")
         if self.start_node_id and step_ids and step_ids[0]:
             if progress_callback:
                 progress_callback(current_step, total_steps, "连接训练开始节点")
+            _pace(0.5)
             try:
                 flow_result = self.create_flow(self.start_node_id, step_ids[0])
                 print(f"  [OK] 训练开始 → 卡片1A")
@@ -522,7 +577,6 @@ class PlatformAPIClient:
         else:
             print(f"  [跳过] 未配置起始节点ID或第一个卡片创建失败")
         current_step += 1
-        time.sleep(0.5)
         
         # ========== 阶段3: 创建A类卡片之间的连线，并设置B类卡片内容 ==========
         print("\n[阶段3] 创建卡片间连线并设置B类卡片...")
@@ -539,6 +593,7 @@ class PlatformAPIClient:
             if progress_callback:
                 progress_callback(current_step, total_steps, f"创建连线 {i+1}/{len(step_ids)-1}")
             
+            _pace(0.8)
             try:
                 # 创建连线
                 flow_result = self.create_flow(start_id, end_id)
@@ -567,13 +622,13 @@ class PlatformAPIClient:
                 flow_ids.append(None)
             
             current_step += 1
-            time.sleep(0.8)
         
         # ========== 阶段4: 从最后一个A类卡片连接到"训练结束" ==========
         print("\n[阶段4] 连接训练结束节点...")
         if self.end_node_id and step_ids and step_ids[-1]:
             if progress_callback:
                 progress_callback(current_step, total_steps, "连接训练结束节点")
+            _pace(0)
             try:
                 flow_result = self.create_flow(step_ids[-1], self.end_node_id)
                 flow_id = flow_result.get("_flow_id")
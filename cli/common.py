@@ -1,27 +1,43 @@
 # -*- coding: utf-8 -*-
 """CLI 共用：解析器选择、进度条、平台配置检查与客户端创建。"""
 import os
-import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-# 本模块被 main.py 或 run_web 等入口加载时，项目根已在 sys.path
-from config import PLATFORM_CONFIG, PLATFORM_ENDPOINTS
-from api_platform import PlatformAPIClient
-from api.routes.platform_config import check_platform_config_keys
+# 本模块被 main.py 或 run_web 等入口加载时，项目根已在 sys.path。
+# config / api_platform / api.routes 均在用到的函数内导入：仅用解析器或进度条的命令（如生成人设）不加载平台客户端与 Web 栈
+if TYPE_CHECKING:
+    from api_platform import PlatformAPIClient
 
-# 延迟导入 parsers，避免 CLI 未用脚本时加载
-def get_parser_for_file(file_path: str):
-    """根据文件扩展名返回对应的解析器函数。"""
+# 延迟导入 parsers，避免 CLI 未用脚本时加载；按扩展名缓存解析器，目录批量处理时不重复分派
+@lru_cache(maxsize=16)
+def _parser_for_extension(ext: str):
     from parsers import get_parser_for_extension
-    ext = os.path.splitext(file_path)[1].lower()
     return get_parser_for_extension(ext)
 
 
+def get_parser_for_file(file_path: str):
+    """根据文件扩展名返回对应的解析器函数。"""
+    return _parser_for_extension(os.path.splitext(file_path)[1].lower())
+
+
+# 上次绘制的百分比：百分比不变时不重绘，避免每个回调都写终端并 flush
+_last_progress_percentage = -1
+# 进度条宽度固定，预先构建所有可能的进度条，回调中直接按格数取用
+_BAR_LEN = 30
+_BARS = tuple("█" * i + "░" * (_BAR_LEN - i) for i in range(_BAR_LEN + 1))
+
+
 def progress_callback(current: int, total: int, message: str):
-    """进度回调，在终端显示进度条。"""
+    """进度回调，在终端显示进度条（仅在开始、百分比变化或完成时重绘）。"""
+    global _last_progress_percentage
     percentage = int(current / total * 100) if total else 0
-    bar_length = 30
-    filled_length = int(bar_length * current / total) if total else 0
-    bar = "█" * filled_length + "░" * (bar_length - filled_length)
+    done = bool(total) and current == total
+    if current and not done and percentage == _last_progress_percentage:
+        return
+    _last_progress_percentage = -1 if done else percentage
+    filled_length = min(max(int(_BAR_LEN * current / total), 0), _BAR_LEN) if total else 0
+    bar = _BARS[filled_length]
     print(f"\r[{bar}] {percentage}% - {message}", end="", flush=True)
     if total and current == total:
         print()
@@ -29,6 +45,9 @@ def progress_callback(current: int, total: int, message: str):
 
 def check_platform_config() -> bool:
     """检查平台配置是否完整，缺失时打印警告并返回 False。"""
+    from api.routes.platform_config import check_platform_config_keys
+    from config import PLATFORM_CONFIG
+
     ok, missing = check_platform_config_keys(PLATFORM_CONFIG)
     if missing:
         print("\n[警告] 以下配置项缺失:")
@@ -39,8 +58,12 @@ def check_platform_config() -> bool:
     return True
 
 
-def create_platform_client() -> PlatformAPIClient:
-    """创建并返回配置好的平台 API 客户端。"""
+@lru_cache(maxsize=1)
+def create_platform_client() -> "PlatformAPIClient":
+    """创建并返回配置好的平台 API 客户端。同一进程内复用同一实例（及其连接池），每次注入开始时客户端会自行重置卡片位置。"""
+    from api_platform import PlatformAPIClient
+    from config import PLATFORM_CONFIG, PLATFORM_ENDPOINTS
+
     client = PlatformAPIClient(PLATFORM_CONFIG)
     client.set_endpoints(PLATFORM_ENDPOINTS)
     return client
@@ -3,7 +3,6 @@
 import os
 import sys
 
-from api_platform import CardInjector
 from cli.common import check_platform_config, create_platform_client, progress_callback
 
 
@@ -23,6 +22,9 @@ def inject_cards_to_platform(
         print("提示: 使用 --preview-inject 可以预览解析结果")
         return False
     try:
+        # 注入器（及其 HTTP 客户端依赖）只在实际注入/预览时加载
+        from api_platform import CardInjector
+
         client = create_platform_client()
         injector = CardInjector(client)
         if preview_only:
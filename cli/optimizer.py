@@ -3,9 +3,6 @@
 import os
 import sys
 
-from config import OUTPUT_DIR, DSPY_OPTIMIZER_CONFIG, DEFAULT_MODEL_TYPE, DEEPSEEK_API_KEY, DOUBAO_API_KEY
-from api.workspace import get_project_dirs
-
 
 def run_build_trainset(input_path: str, output_path: str, verbose: bool = False):
     """从文件或目录构建 trainset 并保存为 JSON。"""
@@ -47,6 +44,8 @@ def run_optimize_dspy(
         print("错误: 未安装 dspy-ai，请运行 pip install dspy-ai")
         sys.exit(1)
     from generators.dspy_optimizer import run_optimize_dspy
+    from config import OUTPUT_DIR, DSPY_OPTIMIZER_CONFIG, DEFAULT_MODEL_TYPE, DEEPSEEK_API_KEY, DOUBAO_API_KEY
+    from api.workspace import get_project_dirs
 
     if not args.trainset:
         parser.error("--optimize-dspy 需要提供 --trainset（trainset JSON 路径）")
@@ -55,6 +54,8 @@ def run_optimize_dspy(
     output_cards = args.cards_output or cfg.get("cards_output_path", os.path.join(_opt_out, "optimizer", "cards_for_eval.md"))
     # 闭环模式下，export_path 仅作为评估结果导出路径（JSON/Markdown），供后续查看与分析
     export_path = args.export_file or os.path.join(_opt_out, "optimizer", "export_score.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_cards)), exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(export_path)), exist_ok=True)
     print("=" * 60)
     print("DSPy 生成器优化")
     print("=" * 60)
@@ -78,6 +79,7 @@ def run_optimize_dspy(
         print("\n  [OK] 优化完成。优化后的程序已返回（后续可接入保存/加载）。")
     except Exception as e:
         print(f"\n[错误] 优化失败: {e}")
-        import traceback
-        traceback.print_exc()
+        if getattr(args, "verbose", False):
+            import traceback
+            traceback.print_exc()
         sys.exit(1)
@@ -3,8 +3,6 @@
 import os
 import sys
 
-from cli.common import get_parser_for_file
-
 
 def generate_personas(
     input_path: str,
@@ -14,6 +12,7 @@ def generate_personas(
 ):
     """根据原始教学材料生成推荐的学生角色配置。"""
     from simulator import PersonaGeneratorFactory
+    from simulator.student_persona import PERSONA_MATERIAL_MAX_CHARS
 
     print("=" * 60)
     print("智能角色生成器")
@@ -23,14 +22,21 @@ def generate_personas(
     if not os.path.exists(input_path):
         print(f"[错误] 文件不存在: {input_path}")
         sys.exit(1)
+    from cli.common import get_parser_for_file
+
     try:
         file_parser = get_parser_for_file(input_path)
         content = file_parser(input_path)
         print(f"[OK] 已读取文件，内容长度: {len(content)} 字符")
     except ValueError:
+        # 纯文本只读取生成器会用到的前缀，大文件不整体载入内存
         with open(input_path, "r", encoding="utf-8") as f:
-            content = f.read()
+            content = f.read(PERSONA_MATERIAL_MAX_CHARS + 1)
         print(f"[OK] 已读取文本文件，内容长度: {len(content)} 字符")
+    if len(content) > PERSONA_MATERIAL_MAX_CHARS:
+        # 生成器只使用材料前 PERSONA_MATERIAL_MAX_CHARS 字符，提前截断以释放完整内容
+        content = content[:PERSONA_MATERIAL_MAX_CHARS]
+        print(f"[提示] 材料已截断到 {PERSONA_MATERIAL_MAX_CHARS} 字符")
     print("\n[生成] 正在调用 LLM 生成角色配置...")
     generator = PersonaGeneratorFactory.create_from_env()
     try:
@@ -39,6 +45,7 @@ def generate_personas(
             num_personas=num_personas,
             include_preset_types=True,
         )
+        del content
         print(f"\n[OK] 成功生成 {len(personas)} 个角色配置")
         print("\n" + "-" * 40)
         print("生成的角色概览:")
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """CLI 平台配置：从 URL 提取课程/任务 ID，写入工作区 platform_config.json。"""
 import json
-import os
 import sys
 
 from api.routes.platform_config import extract_course_and_task_from_url
@@ -36,16 +35,17 @@ def set_project_from_url(url: str, workspace_id: str = None):
     workspace_id = workspace_id.strip()
     get_workspace_dirs(workspace_id)
     path = get_workspace_file_path(workspace_id, "platform_config.json")
-    current = {}
-    if os.path.isfile(path):
+    # 读写共用一次打开：a+ 在文件不存在时创建；内容为空或损坏时从空配置开始
+    with open(path, "a+", encoding="utf-8") as f:
+        f.seek(0)
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                current = json.load(f)
+            current = json.load(f)
         except Exception:
-            pass
-    current["course_id"] = course_id
-    current["train_task_id"] = train_task_id
-    with open(path, "w", encoding="utf-8") as f:
+            current = {}
+        current["course_id"] = course_id
+        current["train_task_id"] = train_task_id
+        f.seek(0)
+        f.truncate()
         json.dump(current, f, ensure_ascii=False, indent=2)
     print(f"\n[成功] 已写入工作区「{workspace_id}」: {path}")
     print("\n" + "=" * 50)
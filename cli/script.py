@@ -4,27 +4,7 @@ import os
 import sys
 from datetime import datetime
 
-from config import (
-    INPUT_DIR,
-    OUTPUT_DIR,
-    CARD_GENERATOR_TYPE,
-    DEEPSEEK_API_KEY,
-    DEFAULT_MODEL_TYPE,
-    DOUBAO_API_KEY,
-    EVALUATION_CONFIG,
-)
-from api.workspace import get_project_dirs
-from parsers import (
-    parse_docx_with_structure,
-    parse_doc_with_structure,
-    extract_task_meta_from_doc,
-    extract_task_meta_from_content_structure,
-)
-from generators import ContentSplitter, list_frameworks, get_framework
-from generators.evaluation_section import build_evaluation_markdown
-
 from cli.common import get_parser_for_file, progress_callback
-from cli.inject import inject_cards_to_platform
 
 
 def run_script(args):
@@ -32,12 +12,36 @@ def run_script(args):
     执行「需要 --input」的默认流程：解析 → 分析 → 写 trainset → 预览或生成卡片 → 可选注入。
     调用前调用方应已校验 args.input 存在。
     """
+    # 配置、解析器与生成器在此处导入：仅 import 本模块（如 --help、其它子命令）时不加载这些依赖
+    from config import (
+        INPUT_DIR,
+        OUTPUT_DIR,
+        CARD_GENERATOR_TYPE,
+        DEEPSEEK_API_KEY,
+        DEFAULT_MODEL_TYPE,
+        DOUBAO_API_KEY,
+        EVALUATION_CONFIG,
+        ensure_dirs,
+    )
+    from api.workspace import get_project_dirs
+    from parsers import (
+        parse_docx_with_structure,
+        parse_doc_with_structure,
+        extract_task_meta_from_doc,
+        extract_task_meta_from_content_structure,
+    )
+    from generators import ContentSplitter, list_frameworks
+    from generators.evaluation_section import build_evaluation_markdown
+
     if args.workspace:
         _input_dir, _output_dir, _ = get_project_dirs(args.workspace.strip())
     else:
+        ensure_dirs()
         _input_dir, _output_dir = INPUT_DIR, OUTPUT_DIR
 
-    if os.path.isabs(args.input) and os.path.exists(args.input):
+    # 绝对路径时只 stat 一次：存在即直接使用，后续不再重复检查
+    input_exists = os.path.isabs(args.input) and os.path.exists(args.input)
+    if input_exists:
         input_path = args.input
     elif args.workspace:
         rel = args.input.replace("input/", "").lstrip("/").replace("\\", "/") or os.path.basename(args.input)
@@ -45,7 +49,7 @@ def run_script(args):
     else:
         input_path = os.path.abspath(args.input)
 
-    if not os.path.exists(input_path):
+    if not input_exists and not os.path.exists(input_path):
         try:
             print(f"错误: 输入文件不存在: {input_path}")
         except (UnicodeEncodeError, UnicodeDecodeError):
@@ -54,8 +58,14 @@ def run_script(args):
             except Exception:
                 print("错误: 输入文件不存在，请检查 --input 与 --workspace")
         sys.exit(1)
+    # 文件名、主干名与扩展名各算一次，后续解析、trainset 与输出头部复用
+    input_name = os.path.basename(input_path)
+    input_stem, input_ext = os.path.splitext(input_name)
+    input_ext = input_ext.lower()
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 文件名与输出头部共用同一时刻，避免两者时间不一致
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     output_filename = f"cards_output_{timestamp}.md"
     if args.output:
         output_path = os.path.abspath(args.output)
@@ -78,13 +88,11 @@ def run_script(args):
         # 步骤1: 解析
         print("[1] 步骤1: 解析输入文件...")
         doc_structure = None
-        ext_lower = input_path.lower()
-        if ext_lower.endswith(".docx"):
-            content, raw_structure = parse_docx_with_structure(input_path)
-            doc_structure = [{"title": s["title"], "level": s.get("level", 1), "content": s.get("content", "")} for s in raw_structure]
-        elif ext_lower.endswith(".doc"):
-            content, raw_structure = parse_doc_with_structure(input_path)
-            doc_structure = [{"title": s["title"], "level": s.get("level", 1), "content": s.get("content", "")} for s in raw_structure]
+        # 结构直接交给 extract_task_meta_from_content_structure（只读，缺省键已由其 .get 兜底），无需逐节复制
+        if input_ext == ".docx":
+            content, doc_structure = parse_docx_with_structure(input_path)
+        elif input_ext == ".doc":
+            content, doc_structure = parse_doc_with_structure(input_path)
         else:
             file_parser = get_parser_for_file(input_path)
             content = file_parser(input_path)
@@ -114,10 +122,10 @@ def run_script(args):
                 course_id = base_input_dirname
             else:
                 parts = [p for p in rel_from_input.split("/") if p]
-                course_id = parts[0] if parts else os.path.splitext(os.path.basename(input_path))[0]
+                course_id = parts[0] if parts else input_stem
 
             # 文档 ID：文件名去扩展名
-            doc_id = os.path.splitext(os.path.basename(input_path))[0]
+            doc_id = input_stem
 
             # 文档级 trainset：trainset_{course_id}__{doc_id}.json
             per_doc_trainset = os.path.join(opt_dir, f"trainset_{course_id}__{doc_id}.json")
@@ -181,16 +189,11 @@ def run_script(args):
         if not frameworks:
             print("   [错误] 框架库中暂无可用生成框架。请在 generators/frameworks/ 下添加框架。")
             sys.exit(1)
-        framework_id = args.framework or CARD_GENERATOR_TYPE or "dspy"
-        if not any(m["id"] == framework_id for m in frameworks):
-            framework_id = frameworks[0]["id"]
-
-        try:
-            GeneratorClass, meta = get_framework(framework_id)
-            print(f"   [INFO] 使用生成框架: {meta['name']}")
-        except ValueError as e:
-            print(f"   [错误] {e}")
-            sys.exit(1)
+        # 按 id 建一次索引，选择与取类都是 O(1)，不再多次线性扫描框架列表
+        fw_by_id = {m["id"]: m for m in frameworks}
+        meta = fw_by_id.get(args.framework or CARD_GENERATOR_TYPE or "dspy") or frameworks[0]
+        GeneratorClass = meta["class"]
+        print(f"   [INFO] 使用生成框架: {meta['name']}")
         try:
             api_key = DEEPSEEK_API_KEY if DEFAULT_MODEL_TYPE != "doubao" else DOUBAO_API_KEY
             generator = GeneratorClass(
@@ -210,13 +213,14 @@ def run_script(args):
         try:
             if doc_structure is not None:
                 task_meta = extract_task_meta_from_content_structure(
-                    content, doc_structure, os.path.splitext(os.path.basename(input_path))[0]
+                    content, doc_structure, input_stem
                 )
             else:
                 task_meta = extract_task_meta_from_doc(input_path)
         except (ValueError, FileNotFoundError):
-            task_meta = {"task_name": os.path.basename(input_path), "description": "", "evaluation_items": []}
+            task_meta = {"task_name": input_name, "description": "", "evaluation_items": []}
 
+        evaluation_md = ""
         if EVALUATION_CONFIG.get("enabled", True):
             evaluation_md = build_evaluation_markdown(
                 task_meta.get("evaluation_items", []),
@@ -224,20 +228,23 @@ def run_script(args):
                 target_total_score=EVALUATION_CONFIG.get("target_total_score", 100),
                 auto_generate_if_empty=EVALUATION_CONFIG.get("auto_generate", True),
             )
-            if evaluation_md:
-                cards_content = cards_content + "\n\n---\n\n" + evaluation_md
 
         header = f"""# 教学卡片
 
-> 生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-> 源文件: {os.path.basename(input_path)}
+> 生成时间: {now.strftime("%Y-%m-%d %H:%M:%S")}
+> 源文件: {input_name}
 > 阶段数量: {len(stages)}
 
 ---
 
 """
         with open(output_path, "w", encoding="utf-8") as f:
-            f.write(header + cards_content)
+            # 分段写入，避免为大卡片内容再拼接出一份完整副本
+            f.write(header)
+            f.write(cards_content)
+            if evaluation_md:
+                f.write("\n\n---\n\n")
+                f.write(evaluation_md)
         _safe_print(f"   [OK] 已保存到: {output_path}\n")
 
         print("=" * 60)
@@ -247,6 +254,8 @@ def run_script(args):
         print("=" * 60)
 
         if args.inject or args.preview_inject:
+            from cli.inject import inject_cards_to_platform
+
             inject_cards_to_platform(
                 output_path,
                 task_name=task_meta.get("task_name"),
@@ -273,7 +282,8 @@ def run_script(args):
         sys.exit(130)
     except Exception as e:
         print(f"\n[错误] 未知错误: {e}")
-        import traceback
-        traceback.print_exc()
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
         print("\n提示: 如果问题与API返回内容相关，请检查您的 DEEPSEEK_API_KEY 是否正确")
         sys.exit(1)
@@ -2,6 +2,10 @@
 """CLI 模拟与评估：学生模拟测试、批量模拟、仅评估。"""
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# 批量模拟时各人设互相独立、主要耗时在 LLM 请求上，按人设并行运行
+BATCH_SIM_MAX_WORKERS = 4
 
 
 def run_simulation(
@@ -14,7 +18,7 @@ def run_simulation(
 ):
     """运行学生模拟测试，可选运行评估。"""
     from simulator import SessionRunner, SessionConfig, SessionMode
-    from simulator import Evaluator, EvaluatorFactory
+    from simulator import EvaluatorFactory
 
     print("=" * 60)
     print("学生模拟测试")
@@ -67,25 +71,31 @@ def run_batch_simulation(
     print("=" * 60)
     print(f"\n卡片文件: {md_path}")
     print(f"人设列表: {', '.join(personas)}\n")
-    results = []
-    for i, persona in enumerate(personas, 1):
-        print(f"\n{'='*40}")
-        print(f"[{i}/{len(personas)}] 测试人设: {persona}")
-        print(f"{'='*40}")
-        persona_output = os.path.join(output_dir, f"persona_{persona}")
+
+    def _run_one(i: int, persona: str) -> str:
+        print(f"\n[{i}/{len(personas)}] 开始测试人设: {persona}")
         try:
             run_simulation(
                 md_path=md_path,
                 persona_id=persona,
                 mode="auto",
-                output_dir=persona_output,
+                output_dir=os.path.join(output_dir, f"persona_{persona}"),
                 verbose=verbose,
                 run_evaluation=True,
             )
-            results.append((persona, "成功"))
+            return "成功"
+        except SystemExit:
+            # run_simulation 失败时会 sys.exit(1)，批量模式下只记为该人设失败
+            return "失败: 模拟测试异常退出"
         except Exception as e:
             print(f"[错误] 人设 {persona} 测试失败: {e}")
-            results.append((persona, f"失败: {e}"))
+            return f"失败: {e}"
+
+    # 多个人设的输出会交错打印，汇总按人设原顺序给出
+    workers = max(1, min(BATCH_SIM_MAX_WORKERS, len(personas)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-sim") as ex:
+        statuses = list(ex.map(_run_one, range(1, len(personas) + 1), personas))
+    results = list(zip(personas, statuses, strict=True))
     print("\n" + "=" * 60)
     print("批量测试结果汇总")
     print("=" * 60)
@@ -137,12 +147,15 @@ def run_simulate_platform(args, parser):
 
     pt_cfg = PlatformTrainConfig.from_env()
     client = PlatformTrainClient(pt_cfg)
-    manager = PersonaManager()
-    persona = manager.get_persona(args.persona)
-    student = StudentFactory.create_from_env(persona)
+    # 开场 runCard 与本地人设/学生模型准备互不依赖：请求在途时并行完成本地准备
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="platform-run-card") as ex:
+        first_future = ex.submit(client.run_card, step_id=step_id)
+        manager = PersonaManager()
+        persona = manager.get_persona(args.persona)
+        student = StudentFactory.create_from_env(persona)
 
     try:
-        first = client.run_card(step_id=step_id)
+        first = first_future.result()
     except Exception as e:
         print(f"[错误] 调用平台 runCard 失败: {e}")
         sys.exit(1)
@@ -2,10 +2,11 @@
 配置文件 - 管理API密钥和全局设置
 """
 import os
-from dotenv import load_dotenv
 
-# 加载.env文件中的环境变量
-load_dotenv()
+# 加载.env文件中的环境变量；部署环境已直接注入变量时可设 EDUFLOW_SKIP_DOTENV=1 跳过
+if os.getenv("EDUFLOW_SKIP_DOTENV") != "1":
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # DeepSeek API配置
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
@@ -23,10 +24,6 @@ INPUT_DIR = os.path.join(os.path.dirname(__file__), "input")
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
 
-# 确保目录存在
-os.makedirs(INPUT_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
 # API调用参数
 MAX_TOKENS = 4096
 TEMPERATURE = 0.7
@@ -113,10 +110,18 @@ CARD_TYPE_ROLE = {
     "B": "transition",
 }  # 可从环境变量扩展，如 CARD_TYPE_ROLE_C=dialogue；首期仅 A/B 生效
 CARD_SEQUENCE_ORDER = os.getenv("CARD_SEQUENCE_ORDER", "AB").strip() or "AB"  # 每阶段内卡片类型顺序
+# 卡片生成时并发请求 LLM 的线程数；设为 1 即退回逐张串行生成（服务商 RPM 较低时使用）
+CARD_GEN_WORKERS = max(1, int(os.getenv("CARD_GEN_WORKERS", "4")))
 
 # DSPy 优化配置（闭环仿真 + 内部评估）
 OPTIMIZER_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "output", "optimizer")
-os.makedirs(OPTIMIZER_OUTPUT_DIR, exist_ok=True)
+
+
+def ensure_dirs():
+    """创建根目录 input/output 与 output/optimizer；由使用这些默认目录的 CLI 入口调用，import 时不再建目录。"""
+    for d in (INPUT_DIR, OUTPUT_DIR, OPTIMIZER_OUTPUT_DIR):
+        os.makedirs(d, exist_ok=True)
+
 
 DSPY_OPTIMIZER_CONFIG = {
     # 生成卡片输出路径（每轮优化写入）
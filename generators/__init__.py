@@ -8,24 +8,44 @@
 """
 from .content_splitter import ContentSplitter
 
-# DSPy 生成器可能需要额外安装 dspy-ai
-try:
-    from .dspy_card_orchestrator import DSPyCardGenerator
-    DSPY_AVAILABLE = True
-except ImportError:
-    DSPyCardGenerator = None
-    DSPY_AVAILABLE = False
-
-try:
-    from .dspy_training_doc_orchestrator import TrainingDocGenerator
-    TRAINING_DOC_GENERATOR_AVAILABLE = True
-except ImportError:
-    TrainingDocGenerator = None
-    TRAINING_DOC_GENERATOR_AVAILABLE = False
-
 # 框架库：发现与选择
 from .frameworks import list_frameworks, get_framework
 
+
+# DSPy 生成器可能需要额外安装 dspy-ai；导入 dspy 需约 2 秒，改为首次访问时再加载，
+# 只用 ContentSplitter / 框架列表的入口（如仅分幕预览）不再为此付出导入开销
+def _load_dspy_card_generator() -> dict:
+    try:
+        from .dspy_card_orchestrator import DSPyCardGenerator
+        return {"DSPyCardGenerator": DSPyCardGenerator, "DSPY_AVAILABLE": True}
+    except ImportError:
+        return {"DSPyCardGenerator": None, "DSPY_AVAILABLE": False}
+
+
+def _load_training_doc_generator() -> dict:
+    try:
+        from .dspy_training_doc_orchestrator import TrainingDocGenerator
+        return {"TrainingDocGenerator": TrainingDocGenerator, "TRAINING_DOC_GENERATOR_AVAILABLE": True}
+    except ImportError:
+        return {"TrainingDocGenerator": None, "TRAINING_DOC_GENERATOR_AVAILABLE": False}
+
+
+_LAZY_LOADERS = {
+    "DSPyCardGenerator": _load_dspy_card_generator,
+    "DSPY_AVAILABLE": _load_dspy_card_generator,
+    "TrainingDocGenerator": _load_training_doc_generator,
+    "TRAINING_DOC_GENERATOR_AVAILABLE": _load_training_doc_generator,
+}
+
+
+def __getattr__(name: str):
+    loader = _LAZY_LOADERS.get(name)
+    if loader is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    values = loader()
+    globals().update(values)
+    return values[name]
+
 __all__ = [
     "ContentSplitter",
     "DSPyCardGenerator",
@@ -12,6 +12,11 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable, List, Tuple
 
+# 多人设仿真共用的线程池：仿真/评估耗时几乎都在等待 LLM 响应，线程即可重叠等待；
+# 池为模块级，DSPy 多线程评估（num_threads>1）时各次 metric 的人设仿真合计并发也受此上限约束
+CLOSED_LOOP_MAX_WORKERS = 6
+_persona_executor = ThreadPoolExecutor(max_workers=CLOSED_LOOP_MAX_WORKERS, thread_name_prefix="closed-loop-sim")
+
 
 def _build_llm_config(api_key: str, model_type: str) -> Tuple[dict, dict]:
     """根据 model_type 构建仿真器与评估器的 LLM 配置。"""
@@ -71,7 +76,7 @@ def run_simulate_and_evaluate(
         (session_log, evaluation_report)
     """
     from simulator.session_runner import SessionRunner, SessionConfig, SessionMode
-    from simulator.evaluator import Evaluator
+    from simulator.evaluator import EvaluatorFactory
 
     def progress(phase: str, message: str) -> None:
         if progress_callback:
@@ -133,7 +138,7 @@ def run_simulate_and_evaluate(
 
     progress("evaluate", "评估对话质量…")
     dialogue = runner.get_dialogue_for_evaluation()
-    evaluator = Evaluator(eval_config)
+    evaluator = EvaluatorFactory.get_shared(eval_config)
     report = evaluator.evaluate(dialogue, session_id=log.session_id)
     return log, report
 
@@ -231,26 +236,25 @@ def make_auto_metric(
 
         if len(ids_to_run) > 1:
             # 三档人设并行，取均值
-            with ThreadPoolExecutor(max_workers=len(ids_to_run)) as ex:
-                futures = {
-                    ex.submit(
-                        _run_one,
-                        persona,
-                        path,
-                        os.path.join(sim_output, f"persona_{persona}"),
-                    ): persona
-                    for persona in ids_to_run
-                }
-                for fut in as_completed(futures):
-                    persona = futures[fut]
-                    sc, lg, rpt = fut.result()
-                    persona_scores[persona] = float(sc)
-                    if rpt:
-                        reports.append(rpt)
-                    if lg:
-                        logs.append(lg)
-                    if rpt is None:
-                        persona_errors[persona] = "仿真/评估失败，已回退低分"
+            futures = {
+                _persona_executor.submit(
+                    _run_one,
+                    persona,
+                    path,
+                    os.path.join(sim_output, f"persona_{persona}"),
+                ): persona
+                for persona in ids_to_run
+            }
+            for fut in as_completed(futures):
+                persona = futures[fut]
+                sc, lg, rpt = fut.result()
+                persona_scores[persona] = float(sc)
+                if rpt:
+                    reports.append(rpt)
+                if lg:
+                    logs.append(lg)
+                if rpt is None:
+                    persona_errors[persona] = "仿真/评估失败，已回退低分"
             mean_score = (
                 sum(persona_scores.values()) / len(persona_scores)
                 if persona_scores
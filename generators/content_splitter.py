@@ -8,6 +8,7 @@ import hashlib
 import json
 import os
 import re
+from functools import lru_cache
 from typing import Optional
 
 try:
@@ -43,6 +44,12 @@ def _disk_cache_dir() -> Optional[str]:
         return None
 
 
+@lru_cache(maxsize=8)
+def _get_client(api_key: str, base_url: str) -> "OpenAI":
+    """按 (api_key, base_url) 复用 OpenAI 客户端（线程安全），各 ContentSplitter 实例共享其连接池，免去重复建连与 TLS 握手。"""
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
 class ContentSplitter:
     """
     内容分割器类
@@ -125,10 +132,7 @@ class ContentSplitter:
             raise ValueError("未提供API密钥")
         self.base_url = (base_url or "").strip() or (DOUBAO_BASE_URL if DEFAULT_MODEL_TYPE == "doubao" else DEEPSEEK_BASE_URL)
         self.model = (model or "").strip() or (DOUBAO_MODEL if DEFAULT_MODEL_TYPE == "doubao" else DEEPSEEK_MODEL)
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-        )
+        self.client = _get_client(self.api_key, self.base_url)
     
     def analyze(self, content: str, use_cache: bool = True) -> dict:
         """
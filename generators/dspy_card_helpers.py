@@ -11,6 +11,16 @@ from typing import Any, Dict, List, Optional
 
 from .dspy_utils import format_card_section
 
+# orjson 为可选依赖：阶段元数据的字段值编码更快；未安装时回退标准库 json（中文不转义）
+try:
+    import orjson
+
+    def _json_value(value: Any) -> str:
+        return orjson.dumps(value).decode("utf-8")
+except ImportError:
+    def _json_value(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
 _GUIDANCE_KEYWORDS = ("讲解", "指导型", "讲授", "展示步骤", "指导讲解")
 _QA_OVERRIDE_KEYWORDS = ("提问", "追问", "考核", "评价", "诊断", "鉴别")
 _GUIDANCE_DISCIPLINE_KEYWORDS = (
@@ -101,6 +111,18 @@ _DISALLOWED_ROLE_DELIVERY_PHRASES = (
     "低声",
 )
 
+# sanitize_npc_role_text 每张 A 卡（含重试、结尾卡）都会调用：情绪词交替式与各正则只在模块加载时构建、编译一次
+_EMOTION_ALT = "|".join(re.escape(w) for w in _DISALLOWED_EMOTION_WORDS)
+_EMOTION_CLAUSE_RE = re.compile(
+    rf"(?:[，、])?\s*(?:你\s*)?感到\s*(?:{_EMOTION_ALT})(?:\s*(?:和|与|及)\s*(?:{_EMOTION_ALT}))*\s*[，。！？!?]?"
+)
+_EMOTION_WORD_RE = re.compile(rf"(?:{_EMOTION_ALT})")
+_DANGLING_CONJ_COMMA_RE = re.compile(r"(?:和|与|及)\s*(?:[，、])")
+_DANGLING_CONJ_END_RE = re.compile(r"(?:和|与|及)\s*([。！？!?])")
+_DELIVERY_CLAUSE_RE = re.compile(r"(语速|语气|语调)\s*[^，。！？!?]*[，、]?")
+_REPEATED_COMMA_RE = re.compile(r"[，、]\s*[，、]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 _B_STATIC_TEMPLATE_PATTERNS = (
     re.compile(r"你在回答中对[^。]{0,60}有一定[^。]{0,80}[。；]?"),
     re.compile(r"不过[^。]{0,80}(还可以更深入|还有待完善)[^。]{0,60}[。；]?"),
@@ -161,38 +183,33 @@ def sanitize_npc_role_text(npc_role_text: str) -> str:
 
     # 先移除“你感到/感到 + 情绪词”这种情绪子句，尽量保留句子其余事实。
     # 例："...，你感到失落和孤独。" -> "...，"
-    emotion_alt = "|".join(re.escape(w) for w in _DISALLOWED_EMOTION_WORDS)
-    s = re.sub(
-        rf"(?:[，、])?\s*(?:你\s*)?感到\s*(?:{emotion_alt})(?:\s*(?:和|与|及)\s*(?:{emotion_alt}))*\s*[，。！？!?]?",
-        "",
-        s,
-    )
+    s = _EMOTION_CLAUSE_RE.sub("", s)
     # 兜底：直接删掉零散情绪词，确保不出现在最终提示词中。
-    s = re.sub(rf"(?:{emotion_alt})", "", s)
+    s = _EMOTION_WORD_RE.sub("", s)
     # 删掉删除情绪词后可能残留的连接词（和/与/及）+ 句末符号。
-    s = re.sub(r"(?:和|与|及)\s*(?:[，、])", "", s)
-    s = re.sub(r"(?:和|与|及)\s*([。！？!?])", r"\1", s)
+    s = _DANGLING_CONJ_COMMA_RE.sub("", s)
+    s = _DANGLING_CONJ_END_RE.sub(r"\1", s)
 
     # 再移除“语速/口吻/神态动作”类片段（尽量做局部替换，避免整段被删空）。
     # 处理“语速X/语气X/语调X …”这类带修饰的情况。
-    s = re.sub(r"(语速|语气|语调)\s*[^，。！？!?]*[，、]?", "", s)
+    s = _DELIVERY_CLAUSE_RE.sub("", s)
     # 处理明确短语
     for phrase in _DISALLOWED_ROLE_DELIVERY_PHRASES:
         s = s.replace(phrase, "")
 
     # 清理多余标点与空白，避免变成“性格XX，常提及…”出现多重逗号。
-    s = re.sub(r"[，、]\s*[，、]+", "，", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _REPEATED_COMMA_RE.sub("，", s)
+    s = _WHITESPACE_RE.sub(" ", s).strip()
     s = s.strip("，,、 ")
     return s
 
 
-def is_guidance_stage(stage: dict) -> bool:
+def is_guidance_stage(stage: dict, stage_text: Optional[str] = None) -> bool:
     """检测该阶段是否为指导/讲解型（而非问答考核型）。"""
-    return detect_interaction_strategy(stage) == "guidance"
+    return detect_interaction_strategy(stage, stage_text) == "guidance"
 
 
-def detect_interaction_strategy(stage: dict) -> str:
+def detect_interaction_strategy(stage: dict, stage_text: Optional[str] = None) -> str:
     """
     识别 A 卡互动策略：
     - guidance: 指导/共情型
@@ -212,8 +229,8 @@ def detect_interaction_strategy(stage: dict) -> str:
     if override in {"qa", "exam", "assessment", "questioning"}:
         return "qa"
 
-    # 2) 自动识别：学科 + 任务语义
-    text = build_stage_text(stage)
+    # 2) 自动识别：学科 + 任务语义（调用方已拼好阶段文本时直接复用）
+    text = stage_text if stage_text is not None else build_stage_text(stage)
     has_guidance_discipline = any(keyword in text for keyword in _GUIDANCE_DISCIPLINE_KEYWORDS)
     has_qa_discipline = any(keyword in text for keyword in _QA_DISCIPLINE_KEYWORDS)
     has_guidance_task = any(keyword in text for keyword in _GUIDANCE_TASK_HINTS)
@@ -247,11 +264,11 @@ def build_stage_text(stage: dict) -> str:
     return " ".join(str(part).strip() for part in parts if str(part).strip())
 
 
-def needs_follow_up_constraint(stage: dict) -> bool:
+def needs_follow_up_constraint(stage: dict, stage_text: Optional[str] = None) -> bool:
     """只有目标明确需要追深说明时，才展示追问类约束。"""
-    if is_guidance_stage(stage):
+    text = stage_text if stage_text is not None else build_stage_text(stage)
+    if is_guidance_stage(stage, text):
         return False
-    text = build_stage_text(stage)
     return any(keyword in text for keyword in _FOLLOW_UP_KEYWORDS)
 
 
@@ -286,13 +303,13 @@ def format_constraint_items(items: List[str]) -> str:
 
 
 def create_stage_meta(stage: dict, default_interaction_rounds: int = 5) -> str:
-    """创建阶段元数据块。"""
-    meta = {
-        "stage_name": stage.get("title", ""),
-        "description": stage.get("description", ""),
-        "interaction_rounds": stage.get("interaction_rounds", default_interaction_rounds),
-    }
-    return f"<!-- STAGE_META: {json.dumps(meta, ensure_ascii=False)} -->\n"
+    """创建阶段元数据块。字段固定，只编码各字段值、键与分隔符直接拼接，输出与 json.dumps(meta) 一致。"""
+    return (
+        '<!-- STAGE_META: {"stage_name": ' + _json_value(stage.get("title", ""))
+        + ', "description": ' + _json_value(stage.get("description", ""))
+        + ', "interaction_rounds": ' + _json_value(stage.get("interaction_rounds", default_interaction_rounds))
+        + "} -->\n"
+    )
 
 
 def build_stage_coverage_hints(stage: dict) -> List[str]:
@@ -342,7 +359,9 @@ def build_display_constraints(raw_constraints: str, stage: dict) -> str:
         item for item in split_constraint_items(raw_constraints)
         if not is_generation_only_constraint(item)
     ]
-    guidance_stage = is_guidance_stage(stage)
+    # 阶段文本只拼一次，策略识别与追问判断共用
+    stage_text = build_stage_text(stage)
+    guidance_stage = is_guidance_stage(stage, stage_text)
 
     if guidance_stage:
         pacing_constraint = "每轮先讲清1-2个步骤或原理，再请学生用一句话复述或确认关键点，不要把整段内容变成连续追问。"
@@ -353,7 +372,7 @@ def build_display_constraints(raw_constraints: str, stage: dict) -> str:
         if not any("每轮" in item or "问题" in item for item in items):
             items.append(pacing_constraint)
 
-        if needs_follow_up_constraint(stage):
+        if needs_follow_up_constraint(stage, stage_text):
             follow_up_constraint = "当本幕目标明确要求学生说明原因、依据或遗漏项时，再顺势补问一层；不需要时不要为了追问而追问。"
             if not any(
                 keyword in item
@@ -4,6 +4,7 @@ DSPy 卡片生成编排器。
 负责模型初始化、A/B 卡生成编排、覆盖补强重试、结尾卡拼装与多线程执行策略。
 """
 
+from concurrent.futures import wait
 from typing import List, Optional
 
 import dspy
@@ -25,9 +26,12 @@ from .dspy_card_modules import (
     CardAEndingGeneratorModule,
     CardBGeneratorModule,
 )
-from .dspy_card_runtime import invoke_with_lm, run_in_generation_context
+from .dspy_card_runtime import invoke_with_lm, run_in_generation_context, submit_card_task
 from .dspy_utils import Retryable, format_card_section, reset_positive_feedback_history
 
+# 单张卡片整体重试前的退避基数（秒）：LM 层已对单次请求重试，整卡失败多为持续限流，立即重发只会再次失败
+CARD_RETRY_BACKOFF = 2.0
+
 
 class DSPyCardGenerator:
     """基于 DSPy 的卡片生成器。"""
@@ -225,7 +229,7 @@ class DSPyCardGenerator:
         ending_num = len(stages) + 1
         return f"# 卡片{ending_num}A\n\n{card_body}"
 
-    @Retryable(max_retries=3, exceptions=(Exception,))
+    @Retryable(max_retries=3, exceptions=(Exception,), backoff=CARD_RETRY_BACKOFF)
     def generate_card_a(
         self,
         stage: dict,
@@ -271,7 +275,7 @@ class DSPyCardGenerator:
         stage_meta = self._create_stage_meta(stage)
         return self._format_card_a(result, stage_index, stage_meta, stage)
 
-    @Retryable(max_retries=3, exceptions=(Exception,))
+    @Retryable(max_retries=3, exceptions=(Exception,), backoff=CARD_RETRY_BACKOFF)
     def generate_card_b(
         self,
         stage: dict,
@@ -313,12 +317,31 @@ class DSPyCardGenerator:
         all_cards = []
         total_stages = len(stages)
 
+        # 各幕 A/B 卡与结尾卡互不依赖：先全部提交并发生成，再按原顺序收集结果并回调。
+        # A 卡与结尾卡的请求都以相同的系统提示+完整剧本开头：先单独发出第 1 张 A 卡，返回后服务端已缓存该前缀，
+        # 其余 A 卡与结尾卡再并发发出即可命中前缀缓存；B 卡不含剧本，与第 1 张 A 卡同时开始。
+        # 注意：正向反馈短语去重历史按卡片实际完成顺序（而非幕次顺序）写入。
+        futures_a = []
+        if stages:
+            futures_a.append(submit_card_task(self.generate_card_a, stages[0], 1, total_stages, original_content))
+        futures_b = []
         for i, stage in enumerate(stages, 1):
+            next_stage = stages[i] if i < total_stages else None
+            futures_b.append(
+                submit_card_task(self.generate_card_b, stage, i, total_stages, next_stage, original_content)
+            )
+        if futures_a:
+            wait(futures_a)
+        for i, stage in enumerate(stages[1:], 2):
+            futures_a.append(submit_card_task(self.generate_card_a, stage, i, total_stages, original_content))
+        ending_future = submit_card_task(self._generate_ending_card_a, stages, original_content)
+
+        for i in range(1, total_stages + 1):
             if progress_callback:
                 progress_callback(i * 2 - 1, total_stages * 2, f"正在生成第{i}幕A类卡片（NPC角色）...")
 
             try:
-                card_a = self.generate_card_a(stage, i, total_stages, original_content)
+                card_a = futures_a[i - 1].result()
                 block = f"# 卡片{i}A\n\n{card_a}"
                 all_cards.append(block)
                 if card_callback:
@@ -335,8 +358,7 @@ class DSPyCardGenerator:
                 progress_callback(i * 2, total_stages * 2, f"正在生成第{i}幕B类卡片（场景过渡）...")
 
             try:
-                next_stage = stages[i] if i < total_stages else None
-                card_b = self.generate_card_b(stage, i, total_stages, next_stage, original_content)
+                card_b = futures_b[i - 1].result()
                 block = f"# 卡片{i}B\n\n{card_b}"
                 all_cards.append(block)
                 if card_callback:
@@ -356,7 +378,7 @@ class DSPyCardGenerator:
         ending_num = total_stages + 1
         ending_label = f"卡片{ending_num}A"
         try:
-            ending_card = self._generate_ending_card_a(stages, original_content)
+            ending_card = ending_future.result()
             all_cards.append(ending_card)
             if card_callback:
                 card_callback(ending_label, ending_card)
@@ -1,15 +1,17 @@
 """
 DSPy 卡片生成运行时支持。
 
-集中管理 dspy.configure 的串行化、专用执行线程与优化器上下文。
+集中管理 dspy.configure 的串行化、专用执行线程、卡片级并发与优化器上下文。
 """
 
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Callable
 
 import dspy
 
+from config import CARD_GEN_WORKERS
+
 # dspy.configure 为全局状态，并发时需串行化 LM 配置与调用。
 _dspy_lm_lock = threading.Lock()
 
@@ -19,9 +21,18 @@ _dspy_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dspy-card
 # DSPy 优化器在非主线程运行时，需在当前线程内直接执行生成。
 _optimizer_context = threading.local()
 
+# 各幕 A/B 卡与结尾卡互不依赖，可并发请求 LLM；并发数兼顾提速与服务商 RPM 限制，可由 CARD_GEN_WORKERS 调整。
+_card_executor = ThreadPoolExecutor(max_workers=CARD_GEN_WORKERS, thread_name_prefix="dspy-card-call")
+
+# 卡片并发线程内的标记：此时用 dspy.context 做线程内 LM 覆盖，不触碰全局配置、也无需全局锁。
+_card_worker_context = threading.local()
+
 
 def invoke_with_lm(lm: dspy.LM, module: Callable[..., Any], **kwargs: Any) -> Any:
-    """统一串行化 dspy.configure 与模块调用。"""
+    """统一串行化 dspy.configure 与模块调用；卡片并发线程内改用线程局部的 dspy.context。"""
+    if getattr(_card_worker_context, "active", False):
+        with dspy.context(lm=lm):
+            return module(**kwargs)
     with _dspy_lm_lock:
         dspy.configure(lm=lm)
         return module(**kwargs)
@@ -35,3 +46,26 @@ def run_in_generation_context(task: Callable[..., Any], *args: Any, **kwargs: An
 
     future = _dspy_executor.submit(task, *args, **kwargs)
     return future.result()
+
+
+def _run_card_task(task: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    _card_worker_context.active = True
+    try:
+        return task(*args, **kwargs)
+    finally:
+        _card_worker_context.active = False
+
+
+def submit_card_task(task: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    提交单张卡片的生成任务，返回 Future。
+    优化器运行时需在当前线程保留 DSPy trace，此时就地同步执行并返回已完成的 Future。
+    """
+    if not getattr(_optimizer_context, "running", False):
+        return _card_executor.submit(_run_card_task, task, *args, **kwargs)
+    future: Future = Future()
+    try:
+        future.set_result(task(*args, **kwargs))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
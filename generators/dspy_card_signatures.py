@@ -5,6 +5,8 @@ DSPy 卡片生成签名定义。
 1. InputField 尽量只承载阶段事实与上下文，不混入展示层拼接逻辑。
 2. OutputField 与最终卡片 section 一一对应，便于单独调优。
 3. 共用提示片段抽成常量，避免 A/B/结尾卡合同漂移。
+4. 含 full_script 的签名把它放在第一个 InputField：同一文档的各幕请求以相同的系统提示+剧本开头，
+   服务端前缀缓存可命中，剧本不必按张重复计费与处理（替代把多幕拼进一次请求的做法）。
 """
 
 import dspy
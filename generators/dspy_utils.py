@@ -4,6 +4,8 @@ DSPy 卡片生成器的统一工具函数
 """
 
 import re
+import time
+import random
 import hashlib
 import threading
 import functools
@@ -339,17 +341,25 @@ def is_same_role(current_role: str, next_role: str) -> bool:
 
 
 class Retryable:
-    """带重试机制的函数包装器"""
+    """
+    带重试机制的函数包装器。
+    backoff > 0 时第 n 次重试前等待 backoff * 2**(n-1) 秒（上限 max_backoff，带随机抖动），
+    避免并发生成遇到限流时各线程立即同时重发。
+    """
     
     def __init__(
         self, 
         max_retries: int = 3,
         exceptions: tuple = (Exception,),
-        on_retry: Optional[Callable[[int, Exception], None]] = None
+        on_retry: Optional[Callable[[int, Exception], None]] = None,
+        backoff: float = 0.0,
+        max_backoff: float = 30.0,
     ):
         self.max_retries = max_retries
         self.exceptions = exceptions
         self.on_retry = on_retry
+        self.backoff = backoff
+        self.max_backoff = max_backoff
     
     def __call__(self, func: Callable) -> Callable:
         @functools.wraps(func)
@@ -363,6 +373,9 @@ class Retryable:
                     if attempt < self.max_retries:
                         if self.on_retry:
                             self.on_retry(attempt, e)
+                        if self.backoff > 0:
+                            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                            time.sleep(delay * random.uniform(0.5, 1.0))
                     else:
                         raise last_exception
         return wrapper
@@ -9,6 +9,7 @@ import re
 import json
 import hashlib
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
@@ -23,6 +24,14 @@ from config import DEEPSEEK_API_KEY
 # 卡片/输出目录（与 workspaces 或根目录 output 一致，不再使用 train/）
 CARDS_ROOT = Path("output")
 
+# trainset 库子目录（相对 output）：按原文档写入的 trainset 均落在此处，API 列表/删除/优化器默认取最新一份
+TRAINSET_LIB_SUBDIR = "trainset_lib"
+# trainset 库中列出的文件扩展名
+TRAINSET_LIB_EXT = frozenset({".json"})
+
+# 目录构建时并发调用 ContentSplitter 的文件数上限（每个文件一次 LLM 分析，I/O 密集）
+TRAINSET_BUILD_MAX_WORKERS = 8
+
 # 项目映射表（可选）：样本ID -> 项目名；无则留空
 PROJECT_MAP: Dict[str, str] = {}
 _projects_json = Path("output/project_map.json")
@@ -113,16 +122,19 @@ def build_trainset_from_path(
     base_url: Optional[str] = None,
     model: Optional[str] = None,
     verbose: bool = False,
+    max_workers: int = TRAINSET_BUILD_MAX_WORKERS,
 ) -> List[Dict[str, Any]]:
     """
     从单个文件或目录构建 trainset。
 
     每条样本为 {"full_script": str, "stages": list}，其中 stages 为 ContentSplitter.analyze 返回的格式。
+    多个文件时以线程池并发解析与分析（至多 max_workers 个同时进行），结果仍按文件路径顺序返回。
 
     Args:
         path: 文件路径或目录路径。目录时将递归查找 .md / .docx / .doc / .pdf。
         api_key: DeepSeek API 密钥（用于 ContentSplitter.analyze）；不传则用 config。
         verbose: 是否打印进度。
+        max_workers: 并发处理的文件数上限；1 表示逐个串行处理。
 
     Returns:
         样本列表，每项含 full_script 与 stages。
@@ -147,9 +159,8 @@ def build_trainset_from_path(
         raise ValueError(f"未在目录下找到 .md / .docx / .doc / .pdf 文件: {path}")
 
     splitter = ContentSplitter(api_key=api_key, base_url=base_url, model=model)
-    examples: List[Dict[str, Any]] = []
 
-    for i, fp in enumerate(files):
+    def build_one(i: int, fp: str) -> Optional[Dict[str, Any]]:
         if verbose:
             print(f"  [trainset] 处理 {i + 1}/{len(files)}: {os.path.basename(fp)}")
         try:
@@ -159,7 +170,7 @@ def build_trainset_from_path(
             if not stages:
                 if verbose:
                     print(f"    [跳过] 未识别出阶段: {fp}")
-                continue
+                return None
             content_hash = compute_content_hash(content, stages)
             course_id, doc_id = infer_course_and_doc_from_source(fp)
             item: Dict[str, Any] = {
@@ -172,21 +183,45 @@ def build_trainset_from_path(
                 item["course_id"] = course_id
             if doc_id:
                 item["doc_id"] = doc_id
-            examples.append(item)
+            return item
         except Exception as e:
             if verbose:
                 print(f"    [错误] {fp}: {e}")
             raise
 
-    return examples
+    workers = max(1, min(max_workers, len(files)))
+    if workers == 1:
+        results = [build_one(i, fp) for i, fp in enumerate(files)]
+    else:
+        ex = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="trainset-build")
+        try:
+            # map 按提交顺序产出结果；任一文件失败时在取结果处抛出，并取消尚未开始的文件
+            results = list(ex.map(build_one, range(len(files)), files))
+        finally:
+            ex.shutdown(wait=True, cancel_futures=True)
+
+    return [item for item in results if item is not None]
 
 
 def save_trainset(examples: List[Dict[str, Any]], json_path: str) -> None:
-    """将样本列表保存为 JSON。stages 等可序列化结构原样写入。"""
+    """将样本列表保存为 JSON。stages 等可序列化结构原样写入。
+
+    先写临时文件再 os.replace：读方不会读到半截文件，且覆盖写也会更新所在目录的 mtime
+    （trainset 库的默认选择缓存依赖目录 mtime 失效）。
+    """
     path = os.path.abspath(json_path)
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(examples, f, ensure_ascii=False, indent=2)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(examples, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 
 def sanitize_trainset_basename(source_filename: str) -> str:
@@ -230,7 +265,7 @@ def write_trainset_for_document(
         return None
     try:
         safe_name = sanitize_trainset_basename(source_filename)
-        lib_dir = os.path.join(output_dir, "trainset_lib")
+        lib_dir = os.path.join(output_dir, TRAINSET_LIB_SUBDIR)
         os.makedirs(lib_dir, exist_ok=True)
         trainset_filename, json_path = _pick_unique_trainset_filename(lib_dir, safe_name)
 
@@ -245,7 +280,7 @@ def write_trainset_for_document(
         except Exception:
             pass
         save_trainset([item], json_path)
-        return f"output/trainset_lib/{trainset_filename}"
+        return f"output/{TRAINSET_LIB_SUBDIR}/{trainset_filename}"
     except Exception:
         return None
 
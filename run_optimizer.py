@@ -31,6 +31,7 @@ from config import (
     DEEPSEEK_API_KEY,
     DSPY_OPTIMIZER_CONFIG,
     OPTIMIZER_OUTPUT_DIR,
+    ensure_dirs,
 )
 from api.workspace import get_workspace_dirs
 from generators.trainset_builder import load_trainset
@@ -116,6 +117,7 @@ def main():
         _, _out, _ = get_workspace_dirs(args.workspace.strip())
         _opt_dir = os.path.join(_out, "optimizer")
     else:
+        ensure_dirs()
         _opt_dir = OPTIMIZER_OUTPUT_DIR  # 已是 .../output/optimizer
 
     # trainset 选择逻辑：
@@ -12,6 +12,8 @@
 
 import os
 import json
+import hashlib
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -243,14 +245,29 @@ class Evaluator:
         Args:
             config: 配置字典
         """
+        resolved = self.resolve_config(config)
+        self.api_url = resolved["api_url"]
+        self.api_key = resolved["api_key"]
+        self.model = resolved["model"]
+        self.service_code = resolved["service_code"]
+        # 开启后相同对话与维度的评估直接复用磁盘缓存的回复，优化器多轮重复评估时省去付费请求
+        self.use_cache = resolved["use_cache"]
+        
+        self.output_dir = Path(resolved["output_dir"])
+
+    @classmethod
+    def resolve_config(cls, config: Optional[dict] = None) -> dict:
+        """补齐默认值后的评估器配置；构造函数与共享实例的缓存键共用，保证两者取值一致。"""
         config = config or {}
         defaults = get_simulator_default_config()
-        self.api_url = config.get("api_url", defaults["api_url"])
-        self.api_key = config.get("api_key", defaults["api_key"])
-        self.model = config.get("model", defaults["model"])
-        self.service_code = config.get("service_code", self.DEFAULT_SERVICE_CODE)
-        
-        self.output_dir = Path(config.get("output_dir", "simulator_output/reports"))
+        return {
+            "api_url": config.get("api_url", defaults["api_url"]),
+            "api_key": config.get("api_key", defaults["api_key"]),
+            "model": config.get("model", defaults["model"]),
+            "service_code": config.get("service_code", cls.DEFAULT_SERVICE_CODE),
+            "use_cache": bool(config.get("use_cache", False)),
+            "output_dir": config.get("output_dir", "simulator_output/reports"),
+        }
     
     def evaluate(
         self,
@@ -370,8 +387,15 @@ class Evaluator:
         sub_config: dict,
         dialogue_text: str,
     ) -> str:
-        """构建评估prompt"""
-        return f"""你是一名专业的教育评估专家。请评估以下对话在"{dim_name}"维度下的"{sub_name}"子维度表现。
+        """构建评估prompt
+
+        对话记录放在 prompt 最前、维度说明放在其后：同一会话的各子维度请求共享相同前缀，
+        支持前缀缓存的服务（如 DeepSeek 上下文缓存）对重复的对话部分按缓存命中计费。
+        """
+        return f"""你是一名专业的教育评估专家。以下是一段教学对话记录，请按记录之后给出的维度进行评估。
+
+## 对话记录
+{dialogue_text}
 
 ## 评估维度说明
 - **维度**: {dim_name}
@@ -379,11 +403,8 @@ class Evaluator:
 - **评估标准**: {sub_config["description"]}
 - **满分**: {sub_config["weight"]}分
 
-## 对话记录
-{dialogue_text}
-
 ## 评估要求
-请基于对话记录，对"{sub_name}"进行评分和分析。
+请评估以上对话在"{dim_name}"维度下的"{sub_name}"子维度表现，基于对话记录进行评分和分析。
 
 请以JSON格式返回评估结果：
 ```json
@@ -416,6 +437,7 @@ class Evaluator:
                 temperature=0.3,
                 service_code=self.service_code,
                 timeout=120,
+                cache=self.use_cache,
             )
             return self._parse_evaluation_response(content, max_score)
         except Exception as e:
@@ -503,6 +525,7 @@ class Evaluator:
             temperature=0.5,
             service_code=self.service_code,
             timeout=60,
+            cache=self.use_cache,
         )
         return self._parse_evaluation_response(content, 100)
     
@@ -530,22 +553,63 @@ class Evaluator:
         return md_path, json_path
 
 
+# 进程内共享的评估器实例：key 为 (api_url, model, api_key 摘要, service_code, use_cache, output_dir)，不保存明文 Key
+_SHARED_EVALUATORS: Dict[tuple, Evaluator] = {}
+_SHARED_EVALUATORS_LOCK = threading.Lock()
+# 闭环优化可按工作区传入不同 Key/输出目录，按最近使用淘汰，避免无限增长
+_SHARED_EVALUATORS_MAX = 16
+
+
 class EvaluatorFactory:
     """评估器工厂"""
     
     @staticmethod
-    def create_from_env() -> Evaluator:
-        """从环境变量创建评估器"""
-        from dotenv import load_dotenv
-        load_dotenv()
+    def _config_from_env() -> dict:
+        """从环境变量读取评估器配置"""
         defaults = get_simulator_default_config()
-        config = {
+        return {
             "api_url": os.getenv("EVALUATOR_API_URL", os.getenv("SIMULATOR_API_URL", defaults["api_url"])),
             "api_key": os.getenv("EVALUATOR_API_KEY", os.getenv("SIMULATOR_API_KEY", defaults["api_key"])),
             "model": os.getenv("EVALUATOR_MODEL", os.getenv("SIMULATOR_MODEL", defaults["model"])),
             "service_code": os.getenv("EVALUATOR_SERVICE_CODE", os.getenv("SIMULATOR_SERVICE_CODE", Evaluator.DEFAULT_SERVICE_CODE)),
+            "use_cache": os.getenv("EVALUATOR_LLM_CACHE", "").lower() in ("true", "1", "yes"),
         }
-        return Evaluator(config)
+    
+    @staticmethod
+    def create_from_env() -> Evaluator:
+        """从环境变量创建评估器"""
+        return Evaluator(EvaluatorFactory._config_from_env())
+    
+    @staticmethod
+    def get_shared_from_env() -> Evaluator:
+        """
+        返回进程内共享的评估器（配置同 create_from_env）。
+        Evaluator 本身无会话状态，同一配置下的请求复用同一实例，避免每次请求重复构造。
+        """
+        return EvaluatorFactory.get_shared(EvaluatorFactory._config_from_env())
+
+    @staticmethod
+    def get_shared(config: dict) -> Evaluator:
+        """按配置返回进程内共享的评估器；闭环优化等反复评估的场景用它代替每次 Evaluator(config)。"""
+        resolved = Evaluator.resolve_config(config)
+        key_hash = hashlib.sha256((resolved["api_key"] or "").encode("utf-8")).hexdigest()
+        cache_key = (
+            resolved["api_url"],
+            resolved["model"],
+            key_hash,
+            resolved["service_code"],
+            resolved["use_cache"],
+            str(resolved["output_dir"]),
+        )
+        with _SHARED_EVALUATORS_LOCK:
+            evaluator = _SHARED_EVALUATORS.pop(cache_key, None)
+            if evaluator is None:
+                evaluator = Evaluator(config)
+                while len(_SHARED_EVALUATORS) >= _SHARED_EVALUATORS_MAX:
+                    del _SHARED_EVALUATORS[next(iter(_SHARED_EVALUATORS))]
+            # 重新插入到末尾：dict 保持插入顺序，最久未用的在最前，超出上限时先淘汰
+            _SHARED_EVALUATORS[cache_key] = evaluator
+            return evaluator
 
 
 def evaluate_session(
@@ -2,14 +2,79 @@
 """
 模拟器统一 LLM 调用：所有 NPC、学生、评估器等共用同一套 HTTP 调用与默认配置。
 """
+import hashlib
 import json
-from typing import List, Dict, Any
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import List, Dict, Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 进程内共享的 HTTP 会话：同一 LLM 服务的调用复用 keep-alive 连接，免去每次 TCP/TLS 握手。
+# 认证信息按请求传 headers，会话本身不保存 Key；并禁用 Cookie，避免不同工作区之间串用服务端 Cookie。
+HTTP_POOL_MAXSIZE = 50
+# 批量/并发模拟时服务端偶发 429 与 5xx：由 urllib3 按指数退避（遵循 Retry-After）在连接池内重试，
+# 避免单次限流让整轮模拟失败；读超时不重试（生成已在服务端进行，重发只会重复计费与等待）
+LLM_RETRY = Retry(
+    total=3,
+    read=0,
+    backoff_factor=1,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """返回进程内共享的 requests.Session（首次调用时创建）。"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=LLM_RETRY)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def close_http_session() -> None:
+    """关闭共享会话并释放连接池（进程退出/服务关闭时调用）。"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+def _disk_cache_dir() -> Optional[str]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    d = os.path.join(root, ".cache", "llm_completions")
+    try:
+        os.makedirs(d, exist_ok=True)
+        return d
+    except OSError:
+        return None
+
+
+def _completion_cache_key(api_url: str, model: str, messages: List[Dict[str, str]], max_tokens: int, temperature: float) -> str:
+    payload = json.dumps(
+        [api_url, model, max_tokens, temperature, messages], ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
 
 
 def get_simulator_default_config() -> dict:
-    """从 config 读取模拟器用默认配置（api_url, api_key, model）。默认使用公司豆包 API。"""
+    """从 config 读取模拟器用默认配置（api_url, api_key, model）。默认使用公司豆包 API。
+    导入 config 时已加载 .env，各 create_from_env 工厂据此直接读环境变量，无需每次重新解析 .env。"""
     from config import DOUBAO_BASE_URL, DOUBAO_API_KEY, DOUBAO_MODEL
 
     base = (DOUBAO_BASE_URL or "").rstrip("/")
@@ -21,6 +86,37 @@ def get_simulator_default_config() -> dict:
     }
 
 
+def _post_chat_completion(
+    api_url: str,
+    api_key: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    *,
+    max_tokens: int,
+    temperature: float,
+    service_code: str,
+    timeout: int,
+) -> dict:
+    """发送一次 Chat Completions 请求，返回解析后的响应 JSON。"""
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    if service_code:
+        headers["serviceCode"] = service_code
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "stream": False,
+    }
+
+    response = get_http_session().post(api_url, headers=headers, json=payload, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
 def call_chat_completion(
     api_url: str,
     api_key: str,
@@ -31,6 +127,7 @@ def call_chat_completion(
     temperature: float = 0.7,
     service_code: str = "",
     timeout: int = 60,
+    cache: bool = False,
 ) -> str:
     """
     调用 OpenAI 兼容的 Chat Completions API，返回单条回复内容。
@@ -44,6 +141,8 @@ def call_chat_completion(
         temperature: 温度
         service_code: 可选请求头 serviceCode
         timeout: 请求超时秒数
+        cache: 为 True 时按 (URL, 模型, 参数, 消息) 复用磁盘上的上次回复（.cache/llm_completions），
+            仅用于评估这类重复输入应得到相同结果的调用；对话模拟需要随机性，不应开启
 
     Returns:
         回复文本（choices[0].message.content 或兼容字段）
@@ -51,24 +150,37 @@ def call_chat_completion(
     Raises:
         RuntimeError: 请求失败或响应无法解析
     """
-    headers = {"Content-Type": "application/json"}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    if service_code:
-        headers["serviceCode"] = service_code
+    cache_file = None
+    if cache:
+        cache_dir = _disk_cache_dir()
+        if cache_dir:
+            key = _completion_cache_key(api_url, model, messages, max_tokens, temperature)
+            cache_file = os.path.join(cache_dir, f"{key}.json")
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)["content"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
 
-    payload = {
-        "model": model,
-        "messages": messages,
-        "max_tokens": max_tokens,
-        "temperature": temperature,
-        "stream": False,
-    }
+    content = _extract_content(_post_chat_completion(
+        api_url, api_key, model, messages,
+        max_tokens=max_tokens, temperature=temperature,
+        service_code=service_code, timeout=timeout,
+    ))
+    if cache_file:
+        # 先写临时文件再原子替换，并发评估时不会读到半截缓存
+        tmp = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"content": content}, f, ensure_ascii=False)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+    return content
 
-    response = requests.post(api_url, headers=headers, json=payload, timeout=timeout)
-    response.raise_for_status()
-    result = response.json()
 
+def _extract_content(result: dict) -> str:
+    """从 Chat Completions 响应中取出回复文本（兼容非标准字段）。"""
     if "choices" in result and len(result["choices"]) > 0:
         return result["choices"][0]["message"]["content"]
     if "content" in result:
@@ -76,3 +188,4 @@ def call_chat_completion(
     if "response" in result:
         return result["response"]
     raise ValueError(f"无法解析 API 响应: {result}")
+
@@ -14,6 +14,23 @@ from dataclasses import dataclass, field
 from .llm_client import get_simulator_default_config, call_chat_completion
 
 
+# 角色约束：NPC 做讲解/提问/点评；控制单轮长度；禁止括号出戏；只输出台词不输出动作描写
+_NPC_ROLE_FIX = (
+    "\n\n【角色约束】你是 NPC，对方是剧情中的角色（由当前卡片的 Context 设定）。"
+    "你的每条回复可以是讲解、提问、点评或引导，但不要替对方陈述思路、答案或设计方案。"
+    "单条回复控制在 200 字以内；如果内容会重复，就先删减重复点。"
+    "严禁在括号里写动作/神态/旁白式描写；如果括号只是纯术语或补充说明，可适当保留，保持沉浸、不出戏。"
+    "回复时只输出角色台词（讲解/提问/点评/引导），不要输出动作或神态描写（如「你微笑着说道」「你看向学生」），否则会破坏沉浸感。"
+    "教学策略：当学生给出建议/回答后，你必须追问至少一个开放式问题（如“为什么/怎么做/具体步骤/会遇到什么困难/如何应对/能否举个例子”），避免只做情绪性认可。"
+    "追问节奏：每轮只追问一个核心点，确保信息密度但不过长。"
+    "去重：避免频繁使用同一种固定句式/连接词（如“对了”“真……真”“以前在村里”等）；避免多轮重复提及同一具体人物名或同一教学细节。若必须引用例子，换一种表述或用泛称。"
+)
+
+
+def _compose_system_content(card_prompt: Optional[str]) -> str:
+    return (card_prompt or "").strip() + _NPC_ROLE_FIX
+
+
 @dataclass
 class NPCMessage:
     """NPC消息"""
@@ -47,6 +64,8 @@ class LLMNPC:
         config = config or {}
         defaults = get_simulator_default_config()
         self.system_prompt = card_prompt
+        self._system_content_src = card_prompt
+        self._system_content = _compose_system_content(card_prompt)
         self.api_url = config.get("api_url", defaults["api_url"])
         self.api_key = config.get("api_key", defaults["api_key"])
         self.model = config.get("model", defaults["model"])
@@ -129,18 +148,11 @@ class LLMNPC:
         Returns:
             NPC的回复
         """
-        # 角色约束：NPC 做讲解/提问/点评；控制单轮长度；禁止括号出戏；只输出台词不输出动作描写
-        role_fix = (
-            "\n\n【角色约束】你是 NPC，对方是剧情中的角色（由当前卡片的 Context 设定）。"
-            "你的每条回复可以是讲解、提问、点评或引导，但不要替对方陈述思路、答案或设计方案。"
-            "单条回复控制在 200 字以内；如果内容会重复，就先删减重复点。"
-            "严禁在括号里写动作/神态/旁白式描写；如果括号只是纯术语或补充说明，可适当保留，保持沉浸、不出戏。"
-            "回复时只输出角色台词（讲解/提问/点评/引导），不要输出动作或神态描写（如「你微笑着说道」「你看向学生」），否则会破坏沉浸感。"
-            "教学策略：当学生给出建议/回答后，你必须追问至少一个开放式问题（如“为什么/怎么做/具体步骤/会遇到什么困难/如何应对/能否举个例子”），避免只做情绪性认可。"
-            "追问节奏：每轮只追问一个核心点，确保信息密度但不过长。"
-            "去重：避免频繁使用同一种固定句式/连接词（如“对了”“真……真”“以前在村里”等）；避免多轮重复提及同一具体人物名或同一教学细节。若必须引用例子，换一种表述或用泛称。"
-        )
-        system_content = (self.system_prompt or "").strip() + role_fix
+        # 系统提示只在卡片 prompt 变化时重新拼接，多轮对话中每轮复用
+        if self._system_content_src is not self.system_prompt:
+            self._system_content_src = self.system_prompt
+            self._system_content = _compose_system_content(self.system_prompt)
+        system_content = self._system_content
         messages = [
             {"role": "system", "content": system_content}
         ]
@@ -273,14 +285,7 @@ class NPCFactory:
             配置好的LLMNPC实例
         """
         import os
-        import importlib
 
-        try:
-            load_dotenv = importlib.import_module("dotenv").load_dotenv
-        except Exception:  # pragma: no cover - 测试/静态分析环境下可缺失 dotenv
-            load_dotenv = lambda: None
-        
-        load_dotenv()
         defaults = get_simulator_default_config()
         config = {
             "api_url": os.getenv("NPC_API_URL", os.getenv("SIMULATOR_API_URL", defaults["api_url"])),
@@ -303,14 +308,7 @@ class NPCFactory:
             配置好的LLMNPC实例
         """
         import os
-        import importlib
 
-        try:
-            load_dotenv = importlib.import_module("dotenv").load_dotenv
-        except Exception:  # pragma: no cover - 测试/静态分析环境下可缺失 dotenv
-            load_dotenv = lambda: None
-        
-        load_dotenv()
         defaults = get_simulator_default_config()
         model = card_model_id if card_model_id else os.getenv("CARD_MODEL_ID", defaults["model"])
         config = {
@@ -161,9 +161,7 @@ class StudentFactory:
             配置好的LLMStudent实例
         """
         import os
-        from dotenv import load_dotenv
-        
-        load_dotenv()
+
         defaults = get_simulator_default_config()
         config = {
             "api_url": os.getenv("SIMULATOR_API_URL", defaults["api_url"]),
@@ -12,6 +12,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
 from typing import Optional, Dict, Any
 
 import requests
@@ -65,6 +66,11 @@ class PlatformTrainClient:
         self.cfg = cfg
         # 平台返回的会话 ID（第一次 runCard 后通常会返回）
         self.session_id: str = ""
+        # 多轮 chat 复用同一 keep-alive 连接，每轮不再重新握手；认证头只设置一次。
+        # 禁用 Cookie 罐，避免服务端 Set-Cookie 覆盖配置中的 Cookie 头。
+        self._http = requests.Session()
+        self._http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self._http.headers.update(self._headers())
 
     # ---------- 内部工具 ----------
 
@@ -110,7 +116,7 @@ class PlatformTrainClient:
             "stepId": step_id,
             "sessionId": session_id or self.session_id or "",
         }
-        resp = requests.post(url, headers=self._headers(), json=payload, timeout=30)
+        resp = self._http.post(url, json=payload, timeout=30)
         resp.raise_for_status()
         data = resp.json()
         if isinstance(data, dict):
@@ -132,7 +138,7 @@ class PlatformTrainClient:
             "text": text,
             "sessionId": session_id or self.session_id or "",
         }
-        resp = requests.post(url, headers=self._headers(), json=payload, timeout=60)
+        resp = self._http.post(url, json=payload, timeout=60)
         resp.raise_for_status()
         data = resp.json()
         if isinstance(data, dict):
@@ -49,9 +49,11 @@ class SessionConfig:
     student_config: Optional[dict] = None
     # 进度回调（phase, message），仿真过程中切换卡片时调用
     progress_callback: Optional[Callable[[str, str], None]] = None
+    # 对话轮次回调（DialogueTurn），每记录一轮对话即调用，供流式接口逐轮推送
+    turn_callback: Optional[Callable[["DialogueTurn"], None]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DialogueTurn:
     """单轮对话"""
     turn_number: int
@@ -184,11 +186,26 @@ class SessionRunner:
         Args:
             md_path: Markdown文件路径
         """
-        self.cards = self.card_loader.load_from_markdown(md_path)
+        self._set_cards(self.card_loader.load_from_markdown(md_path), md_path)
+
+    def load_cards_from_content(self, content: str, source: str = "<content>"):
+        """
+        从内存中的 Markdown 正文加载卡片（调用方已持有内容时免去写盘后再读回）
+
+        Args:
+            content: 卡片 Markdown 正文
+            source: 仅用于错误提示的来源描述
+        """
+        # 浏览器表单提交的正文可能是 CRLF，解析器按 \n---\n 切分卡片
+        content = content.replace("\r\n", "\n")
+        self._set_cards(self.card_loader.parse_markdown_content(content), source)
+
+    def _set_cards(self, cards: List[CardData], source: str):
+        self.cards = cards
         self.a_cards, self.b_cards = self.card_loader.separate_cards(self.cards)
         
         if not self.a_cards:
-            raise ValueError(f"未能从文件中解析出A类卡片: {md_path}")
+            raise ValueError(f"未能从文件中解析出A类卡片: {source}")
         
         print(f"[加载] 共加载 {len(self.a_cards)} 个对话卡, {len(self.b_cards)} 个过渡卡")
     
@@ -603,6 +620,8 @@ class SessionRunner:
             timestamp=datetime.now().isoformat(),
         )
         self.log.dialogue.append(turn)
+        if self.config.turn_callback:
+            self.config.turn_callback(turn)
     
     def _save_log(self):
         """保存会话日志"""
@@ -16,13 +16,15 @@
 """
 
 import os
+import copy
 import json
 import yaml
-import requests
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, field
 
+from .llm_client import get_http_session
+
 
 @dataclass
 class StudentPersona:
@@ -272,6 +274,11 @@ PRESET_PERSONAS = {
 }
 
 
+# 人设 YAML 解析缓存：绝对路径 -> ((mtime_ns, size), 解析结果)。
+# 闭环评估/批量模拟会反复为同一人设新建会话，文件未变时不再重复读取与解析
+_persona_yaml_cache: Dict[str, tuple] = {}
+
+
 class PersonaManager:
     """人设管理器"""
 
@@ -339,9 +346,19 @@ class PersonaManager:
             else:
                 raise FileNotFoundError(f"人设文件不存在: {path}")
         
-        with open(path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        cache_key = str(path.resolve())
+        cached = _persona_yaml_cache.get(cache_key)
+        if cached is not None and cached[0] == key:
+            raw = cached[1]
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                raw = yaml.safe_load(f)
+            _persona_yaml_cache[cache_key] = (key, raw)
+
+        # 复制一份再使用，调用方修改人设不会污染缓存
+        data = copy.deepcopy(raw)
         data["persona_type"] = "custom"
         return StudentPersona.from_dict(data)
     
@@ -655,7 +672,7 @@ class PersonaGenerator:
         }
         
         try:
-            response = requests.post(
+            response = get_http_session().post(
                 self.api_url,
                 headers=headers,
                 json=payload,
@@ -768,8 +785,6 @@ class PersonaGeneratorFactory:
     @staticmethod
     def create_from_env() -> PersonaGenerator:
         """从环境变量创建角色生成器"""
-        from dotenv import load_dotenv
-        load_dotenv()
         defaults = _default_persona_generator_config()
         config = {
             "api_url": os.getenv("SIMULATOR_API_URL", defaults["api_url"]),
@@ -48,6 +48,71 @@ def test_dspy_generator_generate_all_cards_structure():
     assert callable(gen.generate_all_cards)
 
 
+def test_dspy_generate_all_cards_runs_cards_concurrently_in_order(monkeypatch):
+    """各幕 A/B 卡与结尾卡并发生成，输出与回调仍按卡片顺序，单卡失败不影响其它卡。"""
+    import threading
+    import time
+
+    from generators.dspy_card_orchestrator import DSPyCardGenerator
+
+    gen = DSPyCardGenerator(api_key="test-key-for-unit-test")
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+    events = []
+
+    def _slow(text):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            events.append(("start", text))
+        time.sleep(0.05)
+        with lock:
+            running["now"] -= 1
+            events.append(("end", text))
+        if text == "A2":
+            raise RuntimeError("boom")
+        return text
+
+    monkeypatch.setattr(gen, "generate_card_a", lambda stage, i, total, script: _slow(f"A{i}"))
+    monkeypatch.setattr(gen, "generate_card_b", lambda stage, i, total, nxt, script: _slow(f"B{i}"))
+    monkeypatch.setattr(gen, "_generate_ending_card_a", lambda stages, script: _slow("# 卡片4A\n\nEND"))
+    labels = []
+    stages = [{"title": f"阶段{i}"} for i in range(1, 4)]
+
+    cards = gen.generate_all_cards(stages, "剧本", card_callback=lambda label, block: labels.append(label))
+
+    assert labels == ["卡片1A", "卡片1B", "卡片2A", "卡片2B", "卡片3A", "卡片3B", "卡片4A"]
+    assert running["peak"] > 1
+    # 第 1 张 A 卡先返回（剧本前缀已缓存），其余 A 卡与结尾卡随后才发出
+    first_done = events.index(("end", "A1"))
+    assert events.index(("start", "A2")) > first_done
+    assert events.index(("start", "# 卡片4A\n\nEND")) > first_done
+    assert events.index(("start", "B3")) < first_done
+    assert "# 卡片1A\n\nA1" in cards
+    assert "[生成失败: boom]" in cards
+    assert cards.index("# 卡片3B") < cards.index("# 卡片4A")
+
+
+def test_card_prompts_share_script_prefix_across_stages():
+    """同一文档不同幕的 A 卡请求应以相同的系统提示+剧本开头，便于服务端前缀缓存。"""
+    import dspy
+
+    from generators import dspy_card_signatures as sigs
+
+    for sig in (sigs.CardASignature, sigs.CardAGuidanceSignature, sigs.CardAPrologueSignature, sigs.CardAEndingSignature):
+        assert next(iter(sig.input_fields)) == "full_script", sig.__name__
+
+    def _messages(stage_title):
+        inputs = {name: f"{name}-{stage_title}" for name in sigs.CardASignature.input_fields}
+        inputs["full_script"] = "完整剧本"
+        return dspy.ChatAdapter().format(sigs.CardASignature, demos=[], inputs=inputs)
+
+    first, second = _messages("第一幕"), _messages("第二幕")
+    assert first[0] == second[0]
+    assert first[1]["content"].startswith("[[ ## full_script ## ]]\n完整剧本")
+    assert second[1]["content"].startswith("[[ ## full_script ## ]]\n完整剧本")
+
+
 def test_closed_loop_module_import():
     """closed_loop 模块可导入且 run_simulate_and_evaluate 存在。"""
     from generators import closed_loop
@@ -56,6 +121,43 @@ def test_closed_loop_module_import():
     assert callable(closed_loop.run_simulate_and_evaluate)
 
 
+def test_closed_loop_metric_averages_personas_on_shared_pool(monkeypatch, tmp_path):
+    """多人设 metric 在共享线程池上并行仿真，单个人设失败按 0 分计入均值。"""
+    import json
+    import threading
+    from types import SimpleNamespace
+
+    from generators import closed_loop
+
+    threads = []
+
+    def fake_run(cards_path, output_dir, api_key, model_type, persona_id, **kwargs):
+        threads.append(threading.current_thread().name)
+        if persona_id == "struggling":
+            raise RuntimeError("boom")
+        report = SimpleNamespace(
+            total_score={"excellent": 90.0, "average": 60.0}[persona_id],
+            to_dict=lambda: {"total_score": 0},
+            to_markdown=lambda: "# 报告",
+        )
+        return SimpleNamespace(session_id=persona_id), report
+
+    monkeypatch.setattr(closed_loop, "run_simulate_and_evaluate", fake_run)
+    export_path = tmp_path / "export.json"
+    metric = closed_loop.make_auto_metric(
+        output_cards_path=str(tmp_path / "cards.md"),
+        export_path=str(export_path),
+        api_key="k",
+        persona_ids=["excellent", "average", "struggling"],
+    )
+
+    assert metric(None, SimpleNamespace(cards="# 卡片1A")) == pytest.approx(50.0)
+    assert all(name.startswith("closed-loop-sim") for name in threads) and len(threads) == 3
+    data = json.loads(export_path.read_text(encoding="utf-8"))
+    assert data["persona_scores"] == {"excellent": 90.0, "average": 60.0, "struggling": 0.0}
+    assert "struggling" in data["persona_errors"]
+
+
 def _sample_cards_path():
     root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     candidates = [
@@ -81,3 +183,23 @@ def test_local_card_loader_parses_sample():
     assert len(cards) >= 1
     seq = loader.get_card_sequence(cards)
     assert len(seq) >= 1
+
+
+def test_session_runner_loads_cards_from_crlf_content():
+    """CRLF 换行的卡片正文与 LF 解析出相同的卡片。"""
+    from simulator.session_runner import SessionRunner
+
+    content = (
+        "# 卡片1A\n\n# Role\n老师\n\n---\n\n"
+        "# 卡片1B\n\n过渡\n\n---\n\n"
+        "# 卡片2A\n\n# Role\n老师\n"
+    )
+    runner = SessionRunner()
+    runner.load_cards_from_content(content)
+    lf_ids = [c.card_id for c in runner.cards]
+    assert lf_ids == ["1A", "1B", "2A"]
+
+    runner = SessionRunner()
+    runner.load_cards_from_content(content.replace("\n", "\r\n"))
+    assert [c.card_id for c in runner.cards] == lf_ids
+    assert [c.card_id for c in runner.a_cards] == ["1A", "2A"]
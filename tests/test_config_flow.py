@@ -64,6 +64,15 @@ def test_stage_meta_generation():
     assert meta_data.get("interaction_rounds") == 7
 
 
+def test_stage_meta_matches_json_dumps_output():
+    """拼接生成的元数据与按字典 json.dumps 的结果逐字节一致（含中文、引号与默认轮次）。"""
+    from generators import dspy_card_helpers as helpers
+
+    stage = {"title": "第一幕：问诊", "description": '说明 "引号" \\ 反斜杠\n换行'}
+    expected = {"stage_name": stage["title"], "description": stage["description"], "interaction_rounds": 3}
+    assert helpers.create_stage_meta(stage, 3) == f"<!-- STAGE_META: {json.dumps(expected, ensure_ascii=False)} -->\n"
+
+
 def test_stage_meta_parsing():
     """注入器能正确解析 STAGE_META。"""
     from api_platform.card_injector import CardInjector
@@ -135,6 +144,45 @@ def test_content_splitter_prompt_fields():
     assert "interaction_rounds" in prompt
 
 
+def test_llm_clients_shared_across_instances_with_same_config():
+    """相同配置的 ContentSplitter 共享 OpenAI 客户端；评估器按配置共享实例。"""
+    from generators.content_splitter import ContentSplitter
+    from simulator.evaluator import EvaluatorFactory
+
+    a = ContentSplitter(api_key="k1", base_url="https://llm.example/v1", model="m")
+    b = ContentSplitter(api_key="k1", base_url="https://llm.example/v1", model="m2")
+    c = ContentSplitter(api_key="k2", base_url="https://llm.example/v1", model="m")
+    assert a.client is b.client
+    assert a.client is not c.client
+
+    cfg = {"api_url": "https://llm.example/v1/chat/completions", "api_key": "k1", "model": "m"}
+    assert EvaluatorFactory.get_shared(dict(cfg)) is EvaluatorFactory.get_shared(dict(cfg))
+    assert EvaluatorFactory.get_shared(dict(cfg)) is not EvaluatorFactory.get_shared({**cfg, "api_key": "k2"})
+
+
+def test_shared_evaluator_key_uses_constructor_defaults_and_is_bounded(monkeypatch):
+    """缓存键与构造函数的默认值一致；超出上限时淘汰最久未用的实例。"""
+    from simulator import evaluator as ev_mod
+    from simulator.evaluator import Evaluator, EvaluatorFactory
+
+    monkeypatch.setattr(ev_mod, "_SHARED_EVALUATORS", {})
+    monkeypatch.setattr(ev_mod, "_SHARED_EVALUATORS_MAX", 2)
+    monkeypatch.setattr(Evaluator, "DEFAULT_SERVICE_CODE", "SI_Default")
+    cfg = {"api_url": "https://llm.example/v1/chat/completions", "api_key": "k1", "model": "m"}
+
+    default_code = EvaluatorFactory.get_shared(dict(cfg))
+    empty_code = EvaluatorFactory.get_shared({**cfg, "service_code": ""})
+    assert default_code.service_code == Evaluator.DEFAULT_SERVICE_CODE
+    assert empty_code.service_code == ""
+    assert default_code is not empty_code
+    assert EvaluatorFactory.get_shared({**cfg, "service_code": Evaluator.DEFAULT_SERVICE_CODE}) is default_code
+
+    EvaluatorFactory.get_shared({**cfg, "api_key": "k3"})
+    assert len(ev_mod._SHARED_EVALUATORS) == 2
+    assert EvaluatorFactory.get_shared(dict(cfg)) is default_code
+    assert EvaluatorFactory.get_shared({**cfg, "service_code": ""}) is not empty_code
+
+
 def test_normalize_interaction_text_keeps_structured_paragraphs():
     """Interaction 后处理应保留结构化段落，支持多轮逻辑模板。"""
     from generators.dspy_utils import normalize_interaction_text
@@ -449,3 +497,47 @@ def test_transition_anchor_keyword_extraction_and_enforcement():
     out = "我们先进入下一步。"
     forced = runner._force_anchor_into_transition(out, keywords)
     assert any(k in forced for k in keywords)
+
+
+def test_extract_course_and_task_from_url():
+    from api.routes.platform_config import extract_course_and_task_from_url
+
+    url = "https://hike-teaching-center.polymas.com/tch-hike/agent-course-full/C123/ability-training/create?trainTaskId=T456&x=1"
+    assert extract_course_and_task_from_url(url) == ("C123", "T456")
+    assert extract_course_and_task_from_url("https://example.com/") == (None, None)
+
+
+def test_check_platform_config_keys_reports_blank_values_in_order():
+    from api.routes.platform_config import check_platform_config_keys
+
+    cfg = {"cookie": "c", "authorization": "  ", "course_id": "C1", "train_task_id": 0, "start_node_id": "s"}
+    assert check_platform_config_keys(cfg) == (
+        False,
+        ["PLATFORM_AUTHORIZATION", "PLATFORM_TRAIN_TASK_ID", "PLATFORM_END_NODE_ID"],
+    )
+    full = {k: "x" for k in ("cookie", "authorization", "course_id", "train_task_id", "start_node_id", "end_node_id")}
+    assert check_platform_config_keys(full) == (True, [])
+
+
+def test_persona_yaml_reparsed_only_when_file_changes(monkeypatch, tmp_path):
+    import os
+
+    from simulator import student_persona
+
+    path = tmp_path / "p.yaml"
+    path.write_text("name: 小王\nstrengths: [细心]\n", encoding="utf-8")
+    monkeypatch.setattr(student_persona, "_persona_yaml_cache", {})
+    calls = []
+    real_load = student_persona.yaml.safe_load
+    monkeypatch.setattr(student_persona.yaml, "safe_load", lambda f: calls.append(1) or real_load(f))
+    manager = student_persona.PersonaManager(config_dir=str(tmp_path))
+
+    first = manager.load_from_file("p")
+    first.strengths.append("被调用方修改")
+    second = manager.load_from_file("p")
+    assert (second.name, second.strengths, calls) == ("小王", ["细心"], [1])
+
+    path.write_text("name: 小李\n", encoding="utf-8")
+    os.utime(path, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+    assert manager.load_from_file("p").name == "小李"
+    assert calls == [1, 1]
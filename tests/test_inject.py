@@ -2,6 +2,7 @@
 """
 卡片注入相关测试：ParsedCard 转 A 类格式、API 客户端参数、Markdown 解析（需样例文件时跳过）。
 """
+import itertools
 import os
 
 import pytest
@@ -73,3 +74,148 @@ def test_markdown_parsing():
         assert card.card_type in ("A", "B")
     issues = injector.validate_cards(cards)
     assert isinstance(issues, list)
+
+
+def test_api_client_retries_5xx_on_pooled_session(monkeypatch):
+    """5xx 由 session 上的 Retry 在同一连接池内重试，最终成功时返回 JSON。"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from api_platform import api_client
+
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            hits.append(self.client_address[1])
+            status, body = (503, b"busy") if len(hits) < 2 else (200, b'{"code": 200, "data": {}}')
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(api_client.PLATFORM_RETRY, "backoff_factor", 0)
+    try:
+        client = PlatformAPIClient({"base_url": f"http://127.0.0.1:{server.server_port}"})
+        assert client._make_request("POST", "/x", data={}) == {"code": 200, "data": {}}
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert len(hits) == 2
+
+
+def test_inject_cards_creates_a_cards_concurrently_in_order(monkeypatch):
+    """A 类卡片并发创建：step_id 与位置预先按顺序分配，结果按输入顺序返回。"""
+    from api_platform import api_client
+
+    sleeps = []
+    monkeypatch.setattr(api_client.time, "sleep", sleeps.append)
+    client = PlatformAPIClient({"base_url": "http://localhost"})
+    client.set_endpoints(PLATFORM_ENDPOINTS)
+    created, flows = {}, []
+
+    def fake_create_step(step_name, llm_prompt, step_id=None, position=None, **kwargs):
+        created[step_name] = (step_id, position)
+        return {"_step_id": step_id}
+
+    def fake_create_flow(start_step_id, end_step_id, flow_id=None):
+        flows.append((start_step_id, end_step_id))
+        return {"_flow_id": f"f{len(flows)}"}
+
+    monkeypatch.setattr(client, "create_step", fake_create_step)
+    monkeypatch.setattr(client, "create_flow", fake_create_flow)
+    monkeypatch.setattr(client, "edit_flow", lambda **kwargs: {})
+
+    a_cards = [{"step_name": f"卡片{i}A"} for i in range(1, 6)]
+    result = client.inject_cards(a_cards, [{"transition_prompt": "p"}] * 4)
+
+    assert result["step_ids"] == [created[c["step_name"]][0] for c in a_cards]
+    assert [created[c["step_name"]][1]["y"] for c in a_cards] == [100, 300, 500, 700, 900]
+    assert flows == list(itertools.pairwise(result["step_ids"]))
+    assert result["stats"]["successful_a_cards"] == 5
+    # A 卡阶段不再固定 sleep；连线之间仅补足距上次请求不足 0.8s 的部分
+    assert len(sleeps) == 3 and all(0 < d <= 0.8 for d in sleeps)
+
+
+def test_create_step_sends_utf8_json_body_with_template_fields(monkeypatch):
+    import json as _json
+    from types import SimpleNamespace
+
+    client = PlatformAPIClient({"base_url": "http://localhost", "train_task_id": "t1"})
+    sent = {}
+
+    def fake_request(method, url, data=None, timeout=None):
+        sent["data"] = data
+        return SimpleNamespace(status_code=200, raise_for_status=lambda: None, content=b'{"code": 200}')
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    result = client.create_step("卡片1A", "提示词", step_id="s1", position={"x": 1, "y": 2})
+
+    assert result["_step_id"] == "s1"
+    assert "卡片1A".encode("utf-8") in sent["data"]
+    body = _json.loads(sent["data"])
+    assert body["trainTaskId"] == "t1"
+    assert body["positionDTO"] == {"x": 1, "y": 2}
+    detail = body["stepDetailDTO"]
+    assert detail["nodeType"] == "SCRIPT_NODE" and detail["trainSubType"] == "ability"
+    assert detail["llmPrompt"] == "提示词" and detail["interactiveRounds"] == 5
+
+
+def test_generated_ids_are_21_url_safe_chars():
+    import re
+
+    from api_platform.api_client import generate_flow_id, generate_step_id
+
+    ids = {generate_step_id() for _ in range(50)} | {generate_flow_id() for _ in range(50)}
+    assert len(ids) == 100
+    assert all(re.fullmatch(r"[A-Za-z0-9_-]{21}", i) for i in ids)
+
+
+def test_positions_matches_repeated_get_next_position():
+    a = PlatformAPIClient({"base_url": "http://localhost"})
+    b = PlatformAPIClient({"base_url": "http://localhost"})
+    a.reset_position()
+    b.reset_position()
+    assert a._positions(4) == [b._get_next_position() for _ in range(4)]
+    assert a._get_next_position() == b._get_next_position()
+
+
+def test_make_request_parses_bytes_and_falls_back_to_text(monkeypatch):
+    from types import SimpleNamespace
+
+    client = PlatformAPIClient({"base_url": "http://localhost"})
+    bodies = iter(["{\"code\": 0, \"msg\": \"成功\"}".encode("utf-8"), b"<html>ok</html>"])
+
+    def fake_request(method, url, data=None, timeout=None):
+        content = next(bodies)
+        return SimpleNamespace(
+            status_code=200, raise_for_status=lambda: None, content=content, text=content.decode("utf-8")
+        )
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    assert client._make_request("POST", "/a", data={}) == {"code": 0, "msg": "成功"}
+    assert client._make_request("POST", "/b", data={}) == {"raw_response": "<html>ok</html>"}
+
+
+def test_make_request_maps_error_statuses(monkeypatch):
+    from types import SimpleNamespace
+
+    client = PlatformAPIClient({"base_url": "http://localhost"})
+    status = {}
+    monkeypatch.setattr(
+        client.session,
+        "request",
+        lambda method, url, data=None, timeout=None: SimpleNamespace(status_code=status["code"]),
+    )
+    for code, expected in ((401, "认证失败"), (403, "权限不足"), (502, "服务器错误: 502")):
+        status["code"] = code
+        with pytest.raises(RuntimeError, match=expected):
+            client._make_request("POST", "/x", data={})
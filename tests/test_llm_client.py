@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""模拟器 LLM 调用与平台对话客户端测试。"""
+
+from simulator import llm_client
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.payloads = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.payloads.append(json)
+        return _FakeResponse(self.responses.pop(0))
+
+
+def _choices(*contents):
+    return {"choices": [{"message": {"content": c}} for c in contents]}
+
+
+def test_call_chat_completion_disk_cache_only_when_requested(monkeypatch, tmp_path):
+    """cache=True 时相同请求复用磁盘上的回复；不同消息或未开启缓存时照常请求。"""
+    session = _FakeSession([_choices("first"), _choices("other"), _choices("uncached")])
+    monkeypatch.setattr(llm_client, "get_http_session", lambda: session)
+    monkeypatch.setattr(llm_client, "_disk_cache_dir", lambda: str(tmp_path))
+    msgs = [{"role": "user", "content": "评估这段对话"}]
+
+    assert llm_client.call_chat_completion("u", "k", "m", msgs, cache=True) == "first"
+    assert llm_client.call_chat_completion("u", "k", "m", msgs, cache=True) == "first"
+    assert llm_client.call_chat_completion("u", "k", "m", [{"role": "user", "content": "x"}], cache=True) == "other"
+    assert llm_client.call_chat_completion("u", "k", "m", msgs) == "uncached"
+    assert len(session.payloads) == 3
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_npc_system_content_follows_card_prompt_changes(monkeypatch):
+    from simulator import llm_npc
+
+    npc = llm_npc.LLMNPC("  卡片A  ", config={"api_url": "u", "api_key": "k", "model": "m"})
+    seen = []
+    monkeypatch.setattr(npc, "_call_llm", lambda messages: seen.append(messages[0]["content"]) or "好")
+
+    npc.respond("你好")
+    npc.respond("继续")
+    npc.switch_to_card("卡片B")
+    npc.respond("下一幕")
+
+    assert seen[0] == seen[1] == "卡片A" + llm_npc._NPC_ROLE_FIX
+    assert seen[2] == "卡片B" + llm_npc._NPC_ROLE_FIX
+
+
+def test_shared_session_retries_rate_limited_post(monkeypatch):
+    """429 带 Retry-After 时由共享会话自动重试，调用方拿到后续成功的回复。"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    statuses = [429, 200]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status = statuses.pop(0)
+            body = b'{"choices": [{"message": {"content": "ok"}}]}' if status == 200 else b"{}"
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(llm_client, "_http_session", None)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/chat/completions"
+        assert llm_client.call_chat_completion(url, "k", "m", [{"role": "user", "content": "hi"}]) == "ok"
+    finally:
+        llm_client.close_http_session()
+        server.shutdown()
+        server.server_close()
+    assert statuses == []
+
+
+def test_platform_train_client_reuses_connection_and_keeps_configured_cookie():
+    """多轮 chat 复用同一连接；服务端 Set-Cookie 不会覆盖配置中的 Cookie 头。"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from simulator.platform_client import PlatformTrainClient, PlatformTrainConfig
+
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            seen.append((self.client_address[1], self.headers.get("Cookie"), self.headers.get("Authorization")))
+            body = b'{"code": 200, "data": {"sessionId": "s1", "text": "hi"}}'
+            self.send_response(200)
+            self.send_header("Set-Cookie", "other=1; Path=/")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        cfg = PlatformTrainConfig(f"http://127.0.0.1:{server.server_port}", "auth=c", "Bearer t", "task")
+        client = PlatformTrainClient(cfg)
+        client.run_card("step")
+        client.chat("step", "你好")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert client.session_id == "s1"
+    assert [(c, a) for _, c, a in seen] == [("auth=c", "Bearer t"), ("auth=c", "Bearer t")]
+    assert seen[0][0] == seen[1][0]
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""工作区 LLM 配置读取与缓存测试。"""
+
+import json
+import os
+
+from api.routes import llm_config
+
+
+def test_get_llm_config_cache_invalidates_on_file_change(monkeypatch, tmp_path):
+    """配置文件内容变化（mtime/size 变化）后应返回新配置，而非缓存旧值。"""
+    path = tmp_path / "llm_config.json"
+    monkeypatch.setattr(llm_config, "_config_path", lambda workspace_id: str(path))
+    monkeypatch.setattr(llm_config, "_llm_config_cache", {})
+
+    path.write_text(json.dumps({"api_key": "key-one", "model_type": "deepseek"}), encoding="utf-8")
+    first = llm_config.get_llm_config("ws-cache")
+    first["api_key"] = "mutated-by-caller"
+
+    assert llm_config.get_llm_config("ws-cache")["api_key"] == "key-one"
+
+    path.write_text(json.dumps({"api_key": "key-two-longer", "model_type": "deepseek"}), encoding="utf-8")
+    os.utime(path, ns=(1_800_000_000_000_000_000, 1_800_000_000_000_000_000))
+
+    cfg = llm_config.get_llm_config("ws-cache")
+    assert cfg["api_key"] == "key-two-longer"
+    assert cfg["base_url"] == "https://api.deepseek.com"
@@ -71,10 +71,8 @@ def _install_common_mocks(monkeypatch, tmp_path):
     )
     monkeypatch.setattr(
         svc,
-        "list_dir_files_with_mtime",
-        lambda lib_dir_abs, path_prefix, allowed_ext: [
-            {"path": "output/trainset_lib/demo_trainset.json", "mtime": 999999}
-        ],
+        "newest_file",
+        lambda lib_dir_abs, path_prefix, allowed_ext: "output/trainset_lib/demo_trainset.json",
     )
     fake_llm_cfg = types.ModuleType("api.routes.llm_config")
     fake_llm_cfg.require_llm_config = lambda workspace_id: {
@@ -94,9 +92,7 @@ def _install_common_mocks(monkeypatch, tmp_path):
     )
     monkeypatch.setattr(svc, "run_optimize_dspy", lambda **kwargs: _DummyCompiled())
 
-    fake_generators = types.ModuleType("generators")
-    fake_generators.DSPY_AVAILABLE = True
-    monkeypatch.setitem(sys.modules, "generators", fake_generators)
+    monkeypatch.setattr(svc, "DSPY_AVAILABLE", True)
     return output_dir
 
 
@@ -152,3 +148,80 @@ def test_run_optimizer_core_cache_hit_returns_cached_artifacts(monkeypatch, tmp_
     assert result["run_manifest_path"] == "output/optimizer/runs/20260101_000000.json"
     assert result["compiled_artifact_path"] == "output/optimizer/artifacts/20260101_000000.json"
     assert result["trainset_warnings"] == ["[建议] 样本可扩充"]
+
+
+def test_trainset_content_hash_matches_sha256_with_and_without_file_digest(monkeypatch, tmp_path):
+    """流式哈希结果应与整文件 sha256 一致（含无 file_digest 的回退分支）。"""
+    import hashlib
+
+    monkeypatch.setattr(svc, "_blake3", None)
+    data = b"x" * (svc._HASH_CHUNK_SIZE + 123)
+    path = tmp_path / "trainset.json"
+    path.write_bytes(data)
+    expected = hashlib.sha256(data).hexdigest()
+
+    assert svc._trainset_content_hash(str(path)) == expected
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    assert svc._trainset_content_hash(str(path)) == expected
+    assert svc._trainset_content_hash(str(tmp_path / "missing.json")) is None
+
+
+def test_trainset_hash_cached_skips_rehash_for_unchanged_file(monkeypatch, tmp_path):
+    """stat 指纹命中索引时不再读取文件计算哈希；文件变化后重新计算。"""
+    import os
+
+    path = tmp_path / "trainset.json"
+    path.write_text("[]", encoding="utf-8")
+    first = svc._trainset_hash_cached(str(tmp_path), str(path), os.stat(path))
+    assert first == svc._trainset_content_hash(str(path))
+
+    calls = []
+    monkeypatch.setattr(svc, "_trainset_content_hash", lambda p: calls.append(p) or "new-hash")
+    assert svc._trainset_hash_cached(str(tmp_path), str(path), os.stat(path)) == first
+    assert calls == []
+
+    path.write_text("[{}]", encoding="utf-8")
+    assert svc._trainset_hash_cached(str(tmp_path), str(path), os.stat(path)) == "new-hash"
+    assert calls == [str(path)]
+
+
+def test_run_optimizer_core_appends_cache_index_and_hits_next_run(monkeypatch, tmp_path):
+    """一次完整优化后追加 dspy_cache.jsonl，同一 trainset 再次运行应命中缓存。"""
+    output_dir = _install_common_mocks(monkeypatch, tmp_path)
+
+    req = OptimizeRequest(trainset_path=None, optimizer_type="bootstrap", no_cache=False)
+    first = svc.run_optimizer_core(req, workspace_id="w-test")
+    second = svc.run_optimizer_core(req, workspace_id="w-test")
+
+    index_lines = (output_dir / "optimizer" / "dspy_cache.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(index_lines) == 1
+    assert first["cache_hit"] is False
+    assert second["cache_hit"] is True
+    assert second["run_manifest_path"] == first["run_manifest_path"]
+
+
+def test_trainset_content_hash_prefixes_blake3_digests(monkeypatch, tmp_path):
+    """使用 BLAKE3 时摘要带 b3_ 前缀，避免与历史 SHA256 缓存键混淆。"""
+    import hashlib
+
+    class _FakeBlake3:
+        def __init__(self):
+            self._h = hashlib.blake2b()
+
+        def update(self, data):
+            self._h.update(data)
+
+        def hexdigest(self):
+            return self._h.hexdigest()
+
+    path = tmp_path / "trainset.json"
+    path.write_bytes(b"[]")
+    monkeypatch.setattr(svc, "_blake3", _FakeBlake3)
+
+    assert svc._trainset_content_hash(str(path)) == "b3_" + hashlib.blake2b(b"[]").hexdigest()
+
+
+def test_optimize_request_normalizes_model_type():
+    assert OptimizeRequest(model_type=" DeepSeek ").model_type == "deepseek"
+    assert OptimizeRequest(model_type="").model_type is None
+    assert OptimizeRequest().model_type is None
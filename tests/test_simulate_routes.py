@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""学生模拟接口测试。"""
+
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from api.app import app
+from api.routes import auth as auth_routes
+from api.routes import simulate as simulate_route
+from simulator.session_runner import DialogueTurn
+
+
+def _override_workspace() -> str:
+    return "test-workspace"
+
+
+def _install_runner_mocks(monkeypatch, tmp_path):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    cards_file = output_dir / "cards.md"
+    cards_file.write_text("# 卡片1A", encoding="utf-8")
+
+    class DummyRunner:
+        def __init__(self, config):
+            self.config = config
+            self.log = SimpleNamespace(
+                session_id="s-1",
+                start_time="t0",
+                end_time="",
+                config={"mode": "auto"},
+                cards_used=["1A"],
+                dialogue=[],
+                summary={},
+            )
+
+        def load_cards(self, md_path):
+            pass
+
+        def setup(self):
+            pass
+
+        def run(self):
+            for i, (speaker, content) in enumerate([("npc", "你好"), ("student", "老师好")], 1):
+                turn = DialogueTurn(turn_number=i, card_id="1A", speaker=speaker, content=content)
+                self.log.dialogue.append(turn)
+                if self.config.turn_callback:
+                    self.config.turn_callback(turn)
+            self.log.end_time = "t1"
+            self.log.summary = {"status": "completed", "total_turns": 1}
+            return self.log
+
+        def get_dialogue_for_evaluation(self):
+            return [
+                {"turn": d.turn_number, "card_id": d.card_id, "speaker": d.speaker, "content": d.content}
+                for d in self.log.dialogue
+            ]
+
+    monkeypatch.setattr(simulate_route, "SessionRunner", DummyRunner)
+    monkeypatch.setattr(
+        simulate_route,
+        "resolve_workspace_path",
+        lambda workspace_id, path, kind="output", must_exist=False: str(cards_file),
+    )
+    monkeypatch.setattr(
+        simulate_route,
+        "get_project_dirs",
+        lambda workspace_id: (str(tmp_path / "input"), str(output_dir), str(tmp_path)),
+    )
+    monkeypatch.setattr(
+        simulate_route,
+        "require_llm_config",
+        lambda workspace_id: {"api_key": "k", "base_url": "https://example.com", "model": "m"},
+    )
+
+
+def test_run_stream_emits_turn_events_then_done(monkeypatch, tmp_path):
+    """run-stream 应逐轮推送 turn 事件，最后推送不含 dialogue 的 done 事件。"""
+    _install_runner_mocks(monkeypatch, tmp_path)
+
+    app.dependency_overrides[auth_routes.require_workspace_owned] = _override_workspace
+    try:
+        client = TestClient(app)
+        resp = client.post(
+            "/api/simulate/run-stream",
+            json={"cards_path": "output/cards.md", "run_evaluation": False},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200, resp.text
+    events = []
+    for block in resp.text.strip().split("\n\n"):
+        lines = block.split("\n")
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+
+    assert [typ for typ, _ in events] == ["turn", "turn", "done"]
+    assert events[0][1] == {"turn": 1, "card_id": "1A", "speaker": "npc", "content": "你好"}
+    assert events[-1][1]["summary"]["status"] == "completed"
+    assert "dialogue" not in events[-1][1]
+
+
+def test_run_returns_full_dialogue(monkeypatch, tmp_path):
+    """阻塞式 /run 仍返回完整 dialogue。"""
+    _install_runner_mocks(monkeypatch, tmp_path)
+
+    app.dependency_overrides[auth_routes.require_workspace_owned] = _override_workspace
+    try:
+        client = TestClient(app)
+        resp = client.post(
+            "/api/simulate/run",
+            json={"cards_path": "output/cards.md", "run_evaluation": False},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert [d["speaker"] for d in data["dialogue"]] == ["npc", "student"]
+
+
+def test_cards_parsed_returns_304_when_etag_matches(monkeypatch, tmp_path):
+    """cards-parsed 返回 ETag；带相同 If-None-Match 再次请求时返回 304。"""
+    cards_file = tmp_path / "cards.md"
+    cards_file.write_text("# 卡片1A\n\n# Role\n老师\n", encoding="utf-8")
+    monkeypatch.setattr(
+        simulate_route,
+        "resolve_workspace_path",
+        lambda workspace_id, path, kind="output", must_exist=False: str(cards_file),
+    )
+
+    app.dependency_overrides[auth_routes.require_workspace_owned] = _override_workspace
+    try:
+        client = TestClient(app)
+        first = client.get("/api/simulate/cards-parsed", params={"path": "output/cards.md"})
+        etag = first.headers.get("etag")
+        second = client.get(
+            "/api/simulate/cards-parsed",
+            params={"path": "output/cards.md"},
+            headers={"If-None-Match": etag},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200, first.text
+    assert "cards" in first.json()
+    assert etag and etag.startswith('W/"')
+    assert second.status_code == 304
+    assert second.headers.get("etag") == etag
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""trainset 构建测试（LLM 分析以桩替代）。"""
+
+import threading
+
+from generators import trainset_builder
+
+
+def test_build_trainset_from_path_parallel_keeps_file_order(monkeypatch, tmp_path):
+    """目录构建并发处理文件，结果仍按路径排序，未识别出阶段的文件被跳过。"""
+    for name in ("c.md", "a.md", "b.md", "skip.md"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+    seen_threads = set()
+
+    class FakeSplitter:
+        def __init__(self, **kwargs):
+            pass
+
+        def analyze(self, content):
+            seen_threads.add(threading.get_ident())
+            if content == "skip.md":
+                return {"stages": []}
+            return {"stages": [{"id": 1, "title": content}]}
+
+    monkeypatch.setattr(trainset_builder, "ContentSplitter", FakeSplitter)
+    monkeypatch.setattr(trainset_builder, "_parse_content", lambda fp: open(fp, encoding="utf-8").read())
+
+    examples = trainset_builder.build_trainset_from_path(str(tmp_path), api_key="k", max_workers=4)
+
+    assert [e["full_script"] for e in examples] == ["a.md", "b.md", "c.md"]
+    assert threading.get_ident() not in seen_threads
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""工作区路径与目录列表工具测试。"""
+
+import os
+
+from api import workspace
+
+
+def test_list_dir_files_with_mtime_recurses_and_filters(tmp_path):
+    """应递归列出子目录文件、按扩展名过滤（大小写不敏感），并按 path 排序。"""
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "b.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "a.JSON").write_text("{}", encoding="utf-8")
+    (tmp_path / "skip.md").write_text("#", encoding="utf-8")
+    (tmp_path / "sub" / "deep" / "c.json").write_text("{}", encoding="utf-8")
+    os.utime(tmp_path / "b.json", (1_700_000_000, 1_700_000_000))
+
+    files = workspace.list_dir_files_with_mtime(str(tmp_path), "output/lib/", allowed_ext={".json"})
+
+    assert [f["path"] for f in files] == [
+        "output/lib/a.JSON",
+        "output/lib/b.json",
+        "output/lib/sub/deep/c.json",
+    ]
+    assert files[1]["name"] == "b.json"
+    assert files[1]["mtime"] == 1_700_000_000
+
+
+def test_list_dir_files_with_mtime_missing_dir_returns_empty(tmp_path):
+    assert workspace.list_dir_files_with_mtime(str(tmp_path / "missing"), "output/") == []
+
+
+def test_list_dir_files_recurses_and_filters(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "b.md").write_text("#", encoding="utf-8")
+    (tmp_path / "sub" / "a.MD").write_text("#", encoding="utf-8")
+    (tmp_path / "skip.txt").write_text("x", encoding="utf-8")
+
+    files = workspace.list_dir_files(str(tmp_path), "input/", allowed_ext={".md"})
+
+    assert files == [
+        {"path": "input/b.md", "name": "b.md"},
+        {"path": "input/sub/a.MD", "name": "a.MD"},
+    ]
+    assert workspace.list_dir_files(str(tmp_path / "missing"), "input/") == []
+
+
+def test_get_project_dirs_follows_current_project_changes(monkeypatch, tmp_path):
+    """get_project_dirs 缓存应在切换当前项目后失效。"""
+    monkeypatch.setattr(workspace, "_WORKSPACES_DIR", str(tmp_path))
+    monkeypatch.setattr(workspace, "_project_dirs_cache", {})
+    workspace.get_workspace_dirs.cache_clear()
+    try:
+        input_dir, output_dir, root = workspace.get_project_dirs("ws-proj")
+        assert output_dir == os.path.join(root, "output")
+
+        os.makedirs(os.path.join(input_dir, "课程A"))
+        workspace.set_current_project("ws-proj", "课程A")
+        _, output_dir2, _ = workspace.get_project_dirs("ws-proj")
+        assert output_dir2 == os.path.join(root, "output", "课程A")
+        assert os.path.isdir(output_dir2)
+    finally:
+        workspace.get_workspace_dirs.cache_clear()
+
+
+def test_list_dir_files_with_mtime_parallel_matches_serial(monkeypatch, tmp_path):
+    """子目录多时走并发遍历，结果应与串行遍历一致。"""
+    for i in range(10):
+        sub = tmp_path / f"d{i}" / "inner"
+        sub.mkdir(parents=True)
+        (sub / f"f{i}.json").write_text("{}", encoding="utf-8")
+        (tmp_path / f"d{i}" / "skip.txt").write_text("x", encoding="utf-8")
+
+    monkeypatch.setattr(workspace, "_PARALLEL_SCAN_MIN_DIRS", 10_000)
+    serial = workspace.list_dir_files_with_mtime(str(tmp_path), "output/", allowed_ext={".json"})
+    monkeypatch.setattr(workspace, "_PARALLEL_SCAN_MIN_DIRS", 1)
+    parallel = workspace.list_dir_files_with_mtime(str(tmp_path), "output/", allowed_ext={".json"})
+
+    assert len(serial) == 10
+    assert parallel == serial
+
+
+def test_resolve_workspace_path_normalizes_and_rejects_traversal(monkeypatch, tmp_path):
+    import pytest
+
+    from api.exceptions import BadRequestError
+
+    input_dir, output_dir = str(tmp_path / "input"), str(tmp_path / "output")
+    monkeypatch.setattr(workspace, "get_project_dirs", lambda wid: (input_dir, output_dir, str(tmp_path)))
+
+    assert workspace.resolve_workspace_path("w", "output/a/./b/../c.md") == os.path.join(output_dir, "a", "c.md")
+    assert workspace.resolve_workspace_path("w", "\\input\\x.md") == os.path.join(input_dir, "x.md")
+    assert workspace.resolve_workspace_path("w", "output/") == output_dir
+    assert workspace.resolve_output_path("w", "cards.md") == os.path.join(output_dir, "cards.md")
+    for bad in ("output/../secret", "a/../../b", "..", "output//etc/passwd"):
+        with pytest.raises(BadRequestError):
+            workspace.resolve_workspace_path("w", bad)
+
+
+def test_get_current_project_reparses_only_when_file_changes(monkeypatch, tmp_path):
+    monkeypatch.setattr(workspace, "_WORKSPACES_DIR", str(tmp_path))
+    monkeypatch.setattr(workspace, "_current_project_cache", {})
+    monkeypatch.setattr(workspace, "_project_dirs_cache", {})
+    workspace.get_workspace_dirs.cache_clear()
+    try:
+        assert workspace.get_current_project("ws-cur") is None
+        workspace.set_current_project("ws-cur", "课程A", "项目1")
+        first = workspace.get_current_project("ws-cur")
+        first["course"] = "被调用方修改"
+        assert workspace.get_current_project("ws-cur") == {"course": "课程A", "project": "项目1"}
+
+        loads = []
+        real_loads = workspace.json_codec.loads
+        monkeypatch.setattr(workspace.json_codec, "loads", lambda data: loads.append(1) or real_loads(data))
+        workspace.get_current_project("ws-cur")
+        assert loads == []
+
+        workspace.set_current_project("ws-cur", "课程B")
+        assert workspace.get_current_project("ws-cur") == {"course": "课程B", "project": ""}
+        assert loads == []
+
+        path = os.path.join(str(tmp_path), "ws-cur", workspace._CURRENT_PROJECT_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"course": "课程C", "project": "项目2"}')
+        os.utime(path, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+        assert workspace.get_current_project("ws-cur") == {"course": "课程C", "project": "项目2"}
+        assert loads == [1]
+    finally:
+        workspace.get_workspace_dirs.cache_clear()
+
+
+def test_list_projects_courses_and_subprojects(monkeypatch, tmp_path):
+    input_dir = tmp_path / "input"
+    (input_dir / "课程B" / "p2").mkdir(parents=True)
+    (input_dir / "课程B" / "p1").mkdir()
+    (input_dir / "课程B" / "notes.md").write_text("#", encoding="utf-8")
+    (input_dir / "课程A").mkdir()
+    (input_dir / "readme.md").write_text("#", encoding="utf-8")
+    monkeypatch.setattr(workspace, "get_workspace_dirs", lambda wid: (str(input_dir), "", ""))
+
+    assert workspace.list_projects("w") == [
+        {"course": "课程A", "project": "", "path": "课程A"},
+        {"course": "课程B", "project": "p1", "path": "课程B/p1"},
+        {"course": "课程B", "project": "p2", "path": "课程B/p2"},
+    ]
+
+
+def test_newest_file_compares_sub_second_mtime(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.json").write_text("[]", encoding="utf-8")
+    (tmp_path / "sub" / "b.json").write_text("[]", encoding="utf-8")
+    (tmp_path / "c.md").write_text("#", encoding="utf-8")
+    os.utime(tmp_path / "a.json", ns=(1_700_000_000_900_000_000, 1_700_000_000_900_000_000))
+    os.utime(tmp_path / "sub" / "b.json", ns=(1_700_000_000_100_000_000, 1_700_000_000_100_000_000))
+    os.utime(tmp_path / "c.md", ns=(1_800_000_000_000_000_000, 1_800_000_000_000_000_000))
+
+    assert workspace.newest_file(str(tmp_path), "lib/", allowed_ext={".json"}) == "lib/a.json"
+    assert workspace.newest_file(str(tmp_path / "missing"), "lib/") is None
+    files = workspace.list_dir_files_with_mtime(str(tmp_path), "lib/", allowed_ext={".json"})
+    assert [f["mtime"] for f in files] == [1_700_000_000, 1_700_000_000]
+
+
+def test_get_workspace_id_accepts_ascii_and_chinese_rejects_paths():
+    import base64
+
+    import pytest
+
+    from api.exceptions import BadRequestError
+
+    assert workspace.get_workspace_id("my_ws-01") == "my_ws-01"
+    encoded = base64.b64encode("编译原理".encode("utf-8")).decode("ascii")
+    assert workspace.get_workspace_id(encoded) == "编译原理"
+    for bad in ("a/b", "a" * 65, "..", "a b"):
+        with pytest.raises(BadRequestError):
+            workspace.get_workspace_id(bad)
+
+
+def test_decode_workspace_id_header_handles_base64_and_plain_values():
+    import base64
+
+    encoded = base64.b64encode("课程".encode("utf-8")).decode("ascii")
+    assert workspace._decode_workspace_id_header(f" {encoded} ") == "课程"
+    assert workspace._decode_workspace_id_header("my_ws-01") == "my_ws-01"
+    assert workspace._decode_workspace_id_header("è¯¾") == "è¯¾"
+    assert workspace._decode_workspace_id_header("  ") == ""